@@ -0,0 +1,352 @@
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from itertools import groupby
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import select, delete, Integer, Float, DateTime
+
+# Where archived partitions are written (next to the SQLite database by default)
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", os.path.join(os.path.dirname(__file__), "database", "archive"))
+# Settled bets and spins older than this many days are moved to the archive
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "180"))
+# Rows moved per transaction
+ARCHIVE_BATCH_SIZE = 50_000
+# Ids deleted per DELETE statement (stays below SQLite's bound parameter limit)
+DELETE_CHUNK_SIZE = 5_000
+
+
+def _kind(column_type):
+    if isinstance(column_type, DateTime):
+        return "time"
+    if isinstance(column_type, Integer):
+        return "int"
+    if isinstance(column_type, Float):
+        return "float"
+    return "text"
+
+
+class ColumnArchive:
+    """Compressed columnar files holding the archived rows of one table.
+
+    Each partition (a user and month, or a month) is a directory of .npz
+    files, one per archived batch (part-<min id>.npz), with one array per
+    column, sorted by id. In memory, NULL is -1 in integer columns, NaN in float columns,
+    NaT in time columns and None in text columns (object arrays). On disk
+    text columns are stored as codes into a sorted array of their
+    distinct values. manifest.json records the rows, id range and time
+    range of every file, so readers can skip files without opening them;
+    it is updated under a lock on the table directory.
+    """
+
+    def __init__(self, root, table, time_column):
+        self.path = os.path.join(root, table.name)
+        self.table = table
+        self.time_column = time_column
+        self.columns = [(column.name, _kind(column.type)) for column in table.columns]
+
+    # Partitions and manifest
+
+    def _manifest_path(self):
+        return os.path.join(self.path, "manifest.json")
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def manifest(self):
+        """{file: {"rows", "min_id", "max_id", "min_time", "max_time"}}, files named <partition>/part-<min id>"""
+        try:
+            with open(self._manifest_path()) as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            return {}
+
+    def partitions(self, prefix="", after_id=None, start=None, end=None):
+        """Names of the files under `prefix` that may hold ids above `after_id`
+        or rows between two datetimes, in name order (by partition, then id)."""
+        names = []
+        for name, info in sorted(self.manifest().items()):
+            if not name.startswith(prefix):
+                continue
+            if after_id is not None and info["max_id"] <= after_id:
+                continue
+            if start is not None and info["max_time"] and np.datetime64(info["max_time"]) < np.datetime64(start):
+                continue
+            if end is not None and info["min_time"] and np.datetime64(info["min_time"]) > np.datetime64(end):
+                continue
+            names.append(name)
+        return names
+
+    def _file(self, partition):
+        return os.path.join(self.path, *partition.split("/")) + ".npz"
+
+    # Reading and writing
+
+    def read(self, partition):
+        """Columns of one file as {name: array}."""
+        with np.load(self._file(partition)) as data:
+            columns = {}
+            rows = len(data["id"])
+            for name, kind in self.columns:
+                if name not in data.files:
+                    # Column added to the table after the file was written
+                    columns[name] = self._nulls(kind, rows)
+                elif kind == "text":
+                    codes, values = data[name], data[f"{name}__values"]
+                    decoded = np.full(len(codes), None, dtype=object)
+                    present = codes >= 0
+                    decoded[present] = values[codes[present]].astype(object)
+                    columns[name] = decoded
+                else:
+                    columns[name] = data[name]
+            return columns
+
+    @staticmethod
+    def _nulls(kind, rows):
+        if kind == "int":
+            return np.full(rows, -1, dtype=np.int64)
+        if kind == "float":
+            return np.full(rows, np.nan)
+        if kind == "time":
+            return np.full(rows, np.datetime64("NaT"), dtype="datetime64[us]")
+        return np.full(rows, None, dtype=object)
+
+    def to_columns(self, rows):
+        """In-memory columns from database rows (tuples in table column order)."""
+        columns = {}
+        for position, (name, kind) in enumerate(self.columns):
+            values = [row[position] for row in rows]
+            if kind == "int":
+                columns[name] = np.array([-1 if v is None else v for v in values], dtype=np.int64)
+            elif kind == "float":
+                columns[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            elif kind == "time":
+                columns[name] = np.array(values, dtype="datetime64[us]")
+            else:
+                columns[name] = np.array(values, dtype=object)
+        return columns
+
+    def append(self, partition, columns):
+        """Writes rows to a new file of a partition; earlier files are left as they are.
+        Rows an interrupted run already archived (same id) are dropped from the older file,
+        so the run can be repeated.
+        """
+        order = np.argsort(columns["id"], kind="stable")
+        columns = {name: values[order] for name, values in columns.items()}
+        ids = columns["id"]
+        name = f"{partition}/part-{int(ids[0]):012d}"
+        with self._locked():
+            manifest = self.manifest()
+            for other, info in list(manifest.items()):
+                if other == name or not (other == partition or other.startswith(partition + "/")):
+                    continue
+                # Batches are moved oldest id first, so files only overlap after a repeated run
+                if info["max_id"] < ids[0] or info["min_id"] > ids[-1]:
+                    continue
+                existing = self.read(other)
+                kept = ~np.isin(existing["id"], ids)
+                if kept.all():
+                    continue
+                if kept.any():
+                    manifest[other] = self._write(other, {key: values[kept] for key, values in existing.items()})
+                else:
+                    os.remove(self._file(other))
+                    del manifest[other]
+            manifest[name] = self._write(name, columns)
+            with open(self._manifest_path() + ".tmp", "w") as manifest_file:
+                json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+            os.replace(self._manifest_path() + ".tmp", self._manifest_path())
+
+    def _write(self, name, columns):
+        """Writes one file from columns sorted by id and returns its manifest entry."""
+        arrays = {}
+        for column, kind in self.columns:
+            if kind == "text":
+                values = columns[column]
+                distinct = sorted({value for value in values if value is not None})
+                position = {value: code for code, value in enumerate(distinct)}
+                arrays[column] = np.array([-1 if v is None else position[v] for v in values], dtype=np.int32)
+                arrays[f"{column}__values"] = np.array(distinct, dtype=str)
+            else:
+                arrays[column] = columns[column]
+
+        path = self._file(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = path + ".tmp.npz"
+        np.savez_compressed(temporary, **arrays)
+        os.replace(temporary, path)
+
+        times = columns[self.time_column]
+        times = times[~np.isnat(times)]
+        return {
+            "rows": len(columns["id"]),
+            "min_id": int(columns["id"][0]),
+            "max_id": int(columns["id"][-1]),
+            "min_time": str(times.min()) if len(times) else "",
+            "max_time": str(times.max()) if len(times) else ""
+        }
+
+
+def bet_archive(root=None):
+    from src.models.bet import Bet
+    return ColumnArchive(root or ARCHIVE_DIR, Bet.__table__, "bet_time")
+
+
+def spin_archive(root=None):
+    from src.models.spin import Spin
+    return ColumnArchive(root or ARCHIVE_DIR, Spin.__table__, "spun_at")
+
+
+def _move(db, archive, conditions, partition_of, batch_size):
+    """Moves the rows matching `conditions` into the archive, oldest id first, one batch per transaction."""
+    table = archive.table
+    moved = 0
+    while True:
+        with db.engine.begin() as connection:
+            rows = connection.execute(
+                select(*table.columns).where(*conditions).order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                return moved
+            columns = archive.to_columns(rows)
+            partitions = np.array([partition_of(row) for row in rows], dtype=object)
+            for partition in sorted(set(partitions)):
+                selected = partitions == partition
+                archive.append(partition, {name: values[selected] for name, values in columns.items()})
+            # A row changed since it was read (and no longer matching) stays live; readers prefer live rows
+            ids = [row.id for row in rows]
+            for first in range(0, len(ids), DELETE_CHUNK_SIZE):
+                connection.execute(
+                    delete(table).where(table.c.id.in_(ids[first:first + DELETE_CHUNK_SIZE]), *conditions)
+                )
+            moved += len(rows)
+
+
+def archive_history(db, older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE, root=None):
+    """Moves settled bets and spins older than `older_than_days` to the archive.
+
+    Bets are partitioned by user and month (bet/user=<id>/<YYYY-MM>/),
+    spins by month (spin/<YYYY-MM>/), with one file per batch. Every batch
+    is written to its partitions before it is deleted from the database,
+    so a crash leaves rows in both places at worst; readers skip ids that
+    are still live, and the next run replaces the archived copies.
+    Returns {"bets": moved, "spins": moved}.
+    """
+    from src.models.profit_report import SETTLED_STATUSES
+
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    bets, spins = bet_archive(root), spin_archive(root)
+    bet, spin = bets.table, spins.table
+    return {
+        "bets": _move(
+            db, bets, [bet.c.status.in_(SETTLED_STATUSES), bet.c.bet_time < cutoff],
+            lambda row: f"user={row.user_id}/{row.bet_time:%Y-%m}", batch_size
+        ),
+        "spins": _move(
+            db, spins, [spin.c.spun_at < cutoff],
+            lambda row: f"{row.spun_at:%Y-%m}", batch_size
+        ),
+    }
+
+
+def archived_spins(user_id=None, betting_house=None, table_id=None, after_id=0, root=None):
+    """Archived spins of a user or a table with id above `after_id`: (ids, numbers, times), by id."""
+    archive = spin_archive(root)
+    ids, numbers, times = [], [], []
+    for partition in archive.partitions(after_id=after_id):
+        columns = archive.read(partition)
+        selected = columns["id"] > after_id
+        if user_id is not None:
+            selected &= columns["user_id"] == int(user_id)
+        else:
+            selected &= (columns["betting_house"] == betting_house) & (columns["table_id"] == str(table_id)) \
+                & (columns["user_id"] == -1)
+        ids.append(columns["id"][selected])
+        numbers.append(columns["number"][selected])
+        times.append(columns["spun_at"][selected])
+    if not ids:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, "datetime64[us]")
+    ids, numbers, times = np.concatenate(ids), np.concatenate(numbers), np.concatenate(times)
+    order = np.argsort(ids, kind="stable")
+    return ids[order], numbers[order], times[order]
+
+
+def _archived_bets(session, archive, partition):
+    """Columns of a bet archive file without the bets still in the database
+    (a run interrupted before its delete): the live copy is the current one."""
+    bet = archive.table
+    columns = archive.read(partition)
+    ids = columns["id"]
+    live_ids = session.execute(select(bet.c.id).where(
+        bet.c.id.between(int(ids[0]), int(ids[-1])), bet.c.user_id == int(columns["user_id"][0])
+    )).scalars().all()
+    if live_ids:
+        archived = ~np.isin(ids, np.array(live_ids, dtype=np.int64))
+        columns = {name: values[archived] for name, values in columns.items()}
+    return columns
+
+
+def archived_bets(session, user_id, start=None, end=None, root=None):
+    """Yields the archived bets of a user between two datetimes, one dict of columns per
+    partition (month), oldest first. A month can span several files (a bet archived by a
+    later run than the other bets of its month), so rows within a month are not in order."""
+    archive = bet_archive(root)
+    files = archive.partitions(f"user={int(user_id)}/", start=start, end=end)
+    for _, month in groupby(files, key=lambda name: name.split("/part-")[0]):
+        parts = []
+        for name in month:
+            columns = _archived_bets(session, archive, name)
+            selected = np.ones(len(columns["id"]), dtype=bool)
+            if start is not None:
+                selected &= columns["bet_time"] >= np.datetime64(start)
+            if end is not None:
+                selected &= columns["bet_time"] <= np.datetime64(end)
+            if selected.any():
+                parts.append({column: values[selected] for column, values in columns.items()})
+        if parts:
+            yield {column: np.concatenate([part[column] for part in parts]) for column in parts[0]}
+
+
+def archived_bet_totals(session, user_id=None, root=None):
+    """Rollup totals of the archived settled bets: {(user_id, strategy_id, day): {column: amount}}."""
+    from src.models.profit_report import SETTLED_STATUSES
+
+    archive = bet_archive(root)
+    prefix = f"user={int(user_id)}/" if user_id is not None else ""
+    totals = {}
+    for partition in archive.partitions(prefix):
+        columns = _archived_bets(session, archive, partition)
+        selected = np.isin(columns["status"], SETTLED_STATUSES)
+        if not selected.any():
+            continue
+        profit = columns["profit_loss"][selected]
+        profit = np.where(np.isnan(profit), 0.0, profit)
+        stake = columns["bet_amount"][selected]
+        keys = np.stack([
+            columns["user_id"][selected],
+            columns["strategy_id"][selected],
+            columns["bet_time"][selected].astype("datetime64[D]").astype(np.int64)
+        ], axis=1)
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        sums = {
+            "daily_profit": np.bincount(inverse, profit),
+            "total_stake": np.bincount(inverse, stake),
+            "total_bets": np.bincount(inverse),
+            "winning_bets": np.bincount(inverse, profit > 0),
+            "losing_bets": np.bincount(inverse, profit < 0)
+        }
+        for index, (group_user, group_strategy, day) in enumerate(groups):
+            key = (int(group_user), int(group_strategy), (np.datetime64(int(day), "D")).astype(object))
+            entry = totals.setdefault(key, dict.fromkeys(sums, 0))
+            for column, values in sums.items():
+                entry[column] += float(values[index]) if column in ("daily_profit", "total_stake") else int(values[index])
+    return totals
@@ -0,0 +1,205 @@
+from datetime import datetime
+from threading import Lock
+import numpy as np
+from src.strategies.strategy_logic import compile_strategy
+from src.vectorized_simulation import SimulationStats, entry_mask, settle_bets
+
+# Spins loaded from the database per query when a stream catches up
+LOAD_BATCH_SIZE = 100_000
+
+
+class _Buffer:
+    """Append-only numpy array with amortized O(1) appends."""
+
+    def __init__(self, dtype):
+        self._data = np.empty(1024, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        needed = self._size + len(values)
+        if needed > len(self._data):
+            grown = np.empty(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = values
+        self._size = needed
+
+    @property
+    def values(self):
+        return self._data[:self._size]
+
+
+class SpinStream:
+    """Recorded spins of one user or table, in chronological order.
+
+    Keeps the spins and their timestamps in growable arrays and, per
+    trigger key, the array of spins on which the trigger fired. New spins
+    only scan the last `window - 1` spins again, so the trigger indexes
+    are extended incrementally instead of being rebuilt.
+    """
+
+    def __init__(self):
+        self.spins = _Buffer(np.int8)
+        self.times = _Buffer("datetime64[s]")
+        self.last_id = 0  # Id of the latest Spin row loaded
+        self.archive_loaded = False  # Archived spins are read once, before the first database load
+        self._fired = {}
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self.spins)
+
+    def extend(self, numbers, times=None, last_id=None):
+        """Appends spins (and their timestamps, defaulting to now)."""
+        if times is None:
+            times = np.full(len(numbers), np.datetime64(datetime.utcnow(), "s"))
+        self.spins.extend(numbers)
+        self.times.extend(np.asarray(times, dtype="datetime64[s]"))
+        if last_id is not None:
+            self.last_id = last_id
+
+    def fired(self, strategy):
+        """Boolean array, True on the spins where the trigger of `strategy` fired."""
+        key = strategy.trigger_key
+        index = self._fired.get(key)
+        if index is None:
+            index = self._fired[key] = _Buffer(bool)
+        spins = self.spins.values
+        done = len(index)
+        if done < len(spins):
+            trigger = strategy.create_trigger()
+            start = max(0, done - trigger.window + 1)
+            index.extend(trigger.scan(spins[start:])[done - start:])
+        return index.values
+
+    def span(self, start=None, end=None):
+        """Index range [first, last) of the spins between two datetimes."""
+        times = self.times.values
+        first = int(np.searchsorted(times, np.datetime64(start, "s"), "left")) if start else 0
+        last = int(np.searchsorted(times, np.datetime64(end, "s"), "right")) if end else len(times)
+        return first, max(first, last)
+
+
+class SpinStreamCache:
+    """SpinStreams by key, caught up with the Spin table on every use."""
+
+    def __init__(self):
+        self._streams = {}
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None:
+                stream = self._streams[key] = SpinStream()
+            return stream
+
+    def load(self, user_id=None, betting_house=None, table_id=None):
+        """Returns the stream of a user, or of a table of a betting house,
+        after appending the spins recorded since the last load.
+        The first load reads the archived spins (src.archive), then the Spin table.
+        """
+        from src.models.spin import Spin
+        from src.archive import archived_spins
+
+        if user_id is not None:
+            key = ("user", int(user_id))
+            filters = [Spin.user_id == int(user_id)]
+        elif betting_house and table_id:
+            key = ("table", betting_house, str(table_id))
+            # Spins received per table; those reported by users are in their own streams
+            filters = [Spin.betting_house == betting_house, Spin.table_id == str(table_id), Spin.user_id.is_(None)]
+        else:
+            raise ValueError("user_id or betting_house and table_id are required")
+
+        stream = self.get(key)
+        with stream.lock:
+            if not stream.archive_loaded:
+                # Archived spins are older than every live one, so ids continue in the table
+                ids, numbers, times = archived_spins(user_id, betting_house, table_id, after_id=stream.last_id)
+                if len(ids):
+                    stream.extend(numbers, times, int(ids[-1]))
+                stream.archive_loaded = True
+            while True:
+                rows = Spin.query.with_entities(Spin.id, Spin.number, Spin.spun_at).filter(
+                    Spin.id > stream.last_id, *filters
+                ).order_by(Spin.id).limit(LOAD_BATCH_SIZE).all()
+                if not rows:
+                    break
+                stream.extend([row.number for row in rows], [row.spun_at for row in rows], rows[-1].id)
+        return stream
+
+    def evict(self, key=None):
+        """Drops one stream (or every stream)."""
+        with self._lock:
+            if key is None:
+                self._streams.clear()
+            else:
+                self._streams.pop(key, None)
+
+
+def run_backtest(stream, strategy_type, config, start=None, end=None):
+    """Replays the spins of `stream` between two datetimes through a strategy.
+    Uses the same rules and payouts as StrategySimulation.run_simulation.
+    Returns the simulation statistics and the replayed time range.
+    """
+    strategy = compile_strategy(strategy_type, config)
+    if strategy is None:
+        raise ValueError(f"Unknown strategy type: {strategy_type}")
+
+    with stream.lock:
+        first, last = stream.span(start, end)
+        spins = stream.spins.values[first:last]
+        fired = stream.fired(strategy)
+        times = stream.times.values
+
+        # Bets generated by a trigger are placed on the following spin
+        starts = fired[max(first - 1, 0):max(last - 1, 0)]
+        if first == 0:
+            starts = np.concatenate(([False], starts))[:len(spins)]
+
+        template = strategy.template
+        stakes = np.append(template.stakes, 0.0)  # 00 simply loses
+        if strategy.max_entries > 1:
+            starts, _, _ = entry_mask(starts, stakes[spins] > 0, strategy.max_entries)
+        _, profits = settle_bets(starts, spins, stakes, template.total_stake)
+
+        stats = SimulationStats()
+        stats.spins = len(spins)
+        stats.add(profits, len(template.bets), template.total_stake)
+
+        result = stats.to_dict()
+        result.update({
+            "strategy_type": strategy_type,
+            "config": config,
+            "first_spin_at": str(times[first]) if len(spins) else None,
+            "last_spin_at": str(times[last - 1]) if len(spins) else None
+        })
+        return result
+
+# Example Usage (for testing)
+if __name__ == "__main__":
+    import time
+
+    stream = SpinStream()
+    rng = np.random.default_rng(3)
+    base = np.datetime64("2025-01-01T00:00:00", "s")
+    num_spins = 5_000_000
+    stream.extend(rng.integers(0, 37, num_spins), base + np.arange(num_spins) * 30)
+
+    config = {"chip_value": 1.0, "max_entries": 2}
+    for strategy_type in ["terminal_8", "3x3_pattern", "2x7_pattern"]:
+        start = time.perf_counter()
+        result = run_backtest(stream, strategy_type, config)
+        cold = time.perf_counter() - start
+
+        stream.extend(rng.integers(0, 37, 100))  # New spins arrive
+        start = time.perf_counter()
+        result = run_backtest(stream, strategy_type, config)
+        warm = time.perf_counter() - start
+        print(f"{strategy_type}: {result['num_spins']:,} spins, profit {result['total_profit']:.2f} "
+              f"(cold {cold * 1000:.0f} ms, after 100 new spins {warm * 1000:.0f} ms)")
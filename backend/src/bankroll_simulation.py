@@ -0,0 +1,163 @@
+import numpy as np
+from src.strategies.strategy_logic import compile_strategy
+from src.vectorized_simulation import entry_mask, generate_spins
+
+# Spins x paths simulated at once; bounds memory. Peak use is about 55 bytes per cell
+# (float64 profits and cumulative sums, their temporaries, bool masks): ~230 MB per batch
+DEFAULT_BATCH_CELLS = 1 << 22
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _distribution(values, percentiles):
+    """Mean, spread, extremes and percentiles of a 1-D array."""
+    if not len(values):
+        return {"mean": None, "std": None, "min": None, "max": None, "percentiles": {}}
+    return {
+        "mean": float(np.mean(values)),
+        "std": float(np.std(values)),
+        "min": float(np.min(values)),
+        "max": float(np.max(values)),
+        "percentiles": {f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))}
+    }
+
+
+class BankrollSimulation:
+    """Simulates many independent bankroll paths of a strategy at once.
+
+    Every path is a row of a spins matrix; triggers, entries and payouts are
+    computed for all rows together with the same rules as
+    StrategySimulation.run_simulation, and the per-path metrics (drawdown,
+    losing streaks, ruin) are reductions along the rows. Paths are processed
+    in batches of whole rows so memory stays bounded.
+    """
+
+    def __init__(self, seed=None, wheel=None, batch_cells=DEFAULT_BATCH_CELLS):
+        self.rng = np.random.default_rng(seed)
+        self.wheel = wheel
+        self.batch_cells = batch_cells
+
+    def _settle_paths(self, strategy, spins):
+        """Returns (profits, won, lost) matrices for a spins matrix (one path per row)."""
+        template = strategy.template
+        stakes = np.append(template.stakes, 0.0)  # 00 simply loses
+        fired = strategy.create_trigger().scan(spins)
+        # Bets generated by a trigger are placed on the following spin
+        betting = np.zeros(spins.shape, dtype=bool)
+        betting[:, 1:] = fired[:, :-1]
+        stake_on_winner = stakes[spins]
+        if strategy.max_entries > 1:
+            betting, _, _ = entry_mask(betting, stake_on_winner > 0, strategy.max_entries)
+
+        profits = np.where(betting, stake_on_winner * 36 - (template.total_stake - stake_on_winner), 0.0)
+        won = betting & (stake_on_winner > 0)
+        return profits, won, betting & ~won
+
+    def run_paths(self, strategy_type, config, num_paths=1000, num_spins=1000, bankroll=None,
+                  percentiles=DEFAULT_PERCENTILES, band_points=100):
+        """Simulates `num_paths` independent paths of `num_spins` spins.
+
+        bankroll: optional starting bankroll; a path is ruined (and stops
+                  betting) once its balance can no longer cover one entry
+        band_points: number of spins at which the percentile bands are sampled
+        Returns per-path metric distributions, the risk of ruin and the
+        time-to-ruin distribution, and percentile bands of cumulative profit.
+        """
+        strategy = compile_strategy(strategy_type, config)
+        if strategy is None:
+            raise ValueError(f"Unknown strategy type: {strategy_type}")
+        total_stake = strategy.template.total_stake
+
+        band_spins = np.unique(np.linspace(1, num_spins, min(band_points, num_spins)).astype(np.int64))
+        final_profit = np.empty(num_paths)
+        max_drawdown = np.empty(num_paths)
+        longest_losing_streak = np.empty(num_paths, dtype=np.int64)
+        total_entries = np.empty(num_paths, dtype=np.int64)
+        ruined_at = np.full(num_paths, -1, dtype=np.int64)
+        bands = np.empty((num_paths, len(band_spins)))
+
+        batch = max(1, self.batch_cells // max(num_spins, 1))
+        for first in range(0, num_paths, batch):
+            rows = min(batch, num_paths - first)
+            paths = slice(first, first + rows)
+            spins = generate_spins(self.rng, rows * num_spins, self.wheel).reshape(rows, num_spins)
+            profits, won, lost = self._settle_paths(strategy, spins)
+            cumulative = np.cumsum(profits, axis=1)
+            index = np.arange(num_spins)
+
+            if bankroll is not None and num_spins:
+                # Ruined once the balance falls below the stake of one entry
+                broke = bankroll + cumulative < total_stake
+                any_broke = broke.any(axis=1)
+                first_broke = np.where(any_broke, np.argmax(broke, axis=1), num_spins)
+                ruined_at[paths] = np.where(any_broke, first_broke + 1, -1)
+                after_ruin = index > first_broke[:, None]
+                at_ruin = np.take_along_axis(cumulative, np.minimum(first_broke, num_spins - 1)[:, None], axis=1)
+                cumulative = np.where(after_ruin, at_ruin, cumulative)
+                won &= ~after_ruin
+                lost &= ~after_ruin
+
+            if num_spins:
+                running_peak = np.maximum(np.maximum.accumulate(cumulative, axis=1), 0.0)
+                max_drawdown[paths] = np.max(running_peak - cumulative, axis=1)
+                final_profit[paths] = cumulative[:, -1]
+                bands[paths] = cumulative[:, band_spins - 1]
+            else:
+                max_drawdown[paths] = 0.0
+                final_profit[paths] = 0.0
+
+            # Losing streak = lost entries since the latest won entry
+            losses = np.cumsum(lost, axis=1)
+            losses_at_last_win = np.maximum.accumulate(np.where(won, losses, 0), axis=1)
+            longest_losing_streak[paths] = np.max(losses - losses_at_last_win, axis=1, initial=0)
+            total_entries[paths] = np.count_nonzero(won | lost, axis=1)
+
+        ruined = ruined_at > 0
+        if num_paths and len(band_spins):
+            band_values = np.percentile(bands, percentiles, axis=0)
+        else:
+            band_values = np.empty((len(percentiles), 0))
+        result = {
+            "strategy_type": strategy_type,
+            "config": config,
+            "num_paths": num_paths,
+            "num_spins": num_spins,
+            "bankroll": bankroll,
+            "final_profit": _distribution(final_profit, percentiles),
+            "max_drawdown": _distribution(max_drawdown, percentiles),
+            "longest_losing_streak": _distribution(longest_losing_streak, percentiles),
+            "entries_per_path": _distribution(total_entries, percentiles),
+            # Percentiles of cumulative profit across paths, sampled at `spins`
+            "bands": dict(
+                {"spins": band_spins.tolist()},
+                **{f"p{p}": values.tolist() for p, values in zip(percentiles, band_values)}
+            )
+        }
+        if bankroll is not None:
+            times = ruined_at[ruined]
+            counts, edges = np.histogram(times, bins=min(20, num_spins) or 1, range=(1, max(num_spins, 1) + 1))
+            result["risk_of_ruin"] = float(np.mean(ruined)) if num_paths else 0.0
+            result["time_to_ruin"] = _distribution(times, percentiles)
+            result["time_to_ruin"]["histogram"] = {
+                "bin_edges": edges.tolist(),
+                "counts": counts.tolist()
+            }
+        return result
+
+# Example Usage (for testing)
+if __name__ == "__main__":
+    import time
+
+    simulation = BankrollSimulation(seed=11)
+    for strategy_type in ["terminal_8", "3x3_pattern", "2x7_pattern"]:
+        config = {"chip_value": 1.0, "max_entries": 2}
+        start = time.perf_counter()
+        result = simulation.run_paths(strategy_type, config, num_paths=10_000, num_spins=2_000, bankroll=200)
+        elapsed = time.perf_counter() - start
+        print(f"{strategy_type}: {result['num_paths']:,} paths x {result['num_spins']:,} spins in {elapsed:.2f}s")
+        print(f"  Risk of ruin: {result['risk_of_ruin']:.2%}, "
+              f"median time to ruin: {result['time_to_ruin']['percentiles'].get('p50')}")
+        print(f"  Median max drawdown: {result['max_drawdown']['percentiles']['p50']:.2f}, "
+              f"median longest losing streak: {result['longest_losing_streak']['percentiles']['p50']:.0f}")
+        print(f"  Final profit p5/p50/p95: {result['bands']['p5'][-1]:.2f} / "
+              f"{result['bands']['p50'][-1]:.2f} / {result['bands']['p95'][-1]:.2f}")
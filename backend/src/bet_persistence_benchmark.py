@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import time
+from flask import Flask
+from sqlalchemy import event, text
+from src.models.user import db
+from src.models.bet import Bet
+from src.routes.automation import _save_bets
+from src.strategies.strategy_logic import compile_strategy
+
+
+def legacy_save_bets(bets_to_place):
+    """The previous persistence path: one ORM object added per bet, then commit."""
+    records = []
+    for bet_data in bets_to_place:
+        new_bet = Bet(
+            user_id=bet_data["user_id"],
+            strategy_id=bet_data["strategy_id"],
+            betting_house=bet_data["betting_house"],
+            roulette_type=bet_data["roulette_type"],
+            bet_amount=bet_data["bet_amount"],
+            bet_numbers=bet_data["bet_numbers"],
+            status=bet_data["status"]
+        )
+        db.session.add(new_bet)
+        records.append(new_bet)
+    db.session.commit()
+    return records
+
+
+def spin_bets(strategy_count):
+    """Bets generated by one spin on which `strategy_count` 3x3 strategies trigger."""
+    template = compile_strategy("3x3_pattern", {}).template
+    return [{
+        "user_id": 1,
+        "strategy_id": strategy_id,
+        "betting_house": "betfair",
+        "roulette_type": "evolution",
+        "bet_amount": bet["amount"],
+        "bet_numbers": json.dumps([bet["number"]]),
+        "status": "pending_placement"
+    } for strategy_id in range(1, strategy_count + 1) for bet in template.bets]
+
+
+def measure(save, bets_to_place, spins):
+    """Mean milliseconds and SQL statements per spin of persisting and serializing the bets."""
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    start = time.perf_counter()
+    for _ in range(spins):
+        [bet.to_dict() for bet in save(bets_to_place)]
+    elapsed = time.perf_counter() - start
+    event.remove(db.engine, "before_cursor_execute", listener)
+    return elapsed / spins * 1000, len(statements) / spins
+
+
+# Per-spin cost of persisting the generated bets at 1, 10 and 100 triggered strategies.
+# Usage: python -m src.bet_persistence_benchmark [spins] [database url]
+if __name__ == "__main__":
+    spins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    url = sys.argv[2] if len(sys.argv) > 2 else "sqlite:////tmp/bet_persistence_benchmark.db"
+    if url.startswith("sqlite:///") and os.path.exists(url[len("sqlite:///"):]):
+        os.remove(url[len("sqlite:///"):])
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+
+        print(f"{'strategies':>10} {'bets':>6} {'legacy ms':>10} {'bulk ms':>8} {'legacy SQL':>11} {'bulk SQL':>9}")
+        for strategy_count in (1, 10, 100):
+            bets_to_place = spin_bets(strategy_count)
+            legacy_ms, legacy_sql = measure(legacy_save_bets, bets_to_place, spins)
+            bulk_ms, bulk_sql = measure(_save_bets, bets_to_place, spins)
+            print(f"{strategy_count:>10} {len(bets_to_place):>6} {legacy_ms:>10.2f} {bulk_ms:>8.2f} "
+                  f"{legacy_sql:>11.1f} {bulk_sql:>9.1f}")
+        print(f"Rows written: {db.session.execute(text('SELECT COUNT(*) FROM bet')).scalar():,}")
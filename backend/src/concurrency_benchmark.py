@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.exc import OperationalError
+from src.models.user import db
+from src.models.strategy import Strategy
+from src.models.bet import Bet
+from src.models.spin import Spin
+from src.models.engine import engine_options, tune_engine
+from src.query_plans import hot_queries, populate
+
+# Bets written per simulated spin: 10 strategies of 11 bets each
+BETS_PER_SPIN = 110
+
+
+def make_engine(url, tuned):
+    """The engine the app used before (library defaults) or the tuned one."""
+    if not tuned:
+        return create_engine(url)
+    engine = create_engine(url, **engine_options(url))
+    tune_engine(engine)
+    return engine
+
+
+def write_spin(connection, rng):
+    """What process_spin writes: the spin and every generated bet, in one transaction."""
+    with connection.begin():
+        connection.execute(insert(Spin), {"betting_house": "betfair", "number": int(rng.integers(0, 37))})
+        connection.execute(insert(Bet), [{
+            "user_id": 1,
+            "strategy_id": int(strategy_id),
+            "betting_house": "betfair",
+            "roulette_type": "evolution",
+            "bet_time": datetime.utcnow(),
+            "bet_amount": 1.0,
+            "bet_numbers": "[17]",
+            "status": "pending_placement"
+        } for strategy_id in rng.integers(1, 6, BETS_PER_SPIN)])
+
+
+def read_dashboard(connection):
+    """What a dashboard load reads: a page of bets and the bet stats."""
+    today = date.today()
+    queries = hot_queries(2, today - timedelta(days=30), today, 3)
+    connection.execute(queries["bets"]).fetchall()
+    connection.execute(queries["bet_stats"]).fetchall()
+    connection.rollback()
+
+
+def worker(role, url, tuned, start_at, duration, results):
+    """Runs one kind of operation in a loop, like one gunicorn worker; reports latencies."""
+    engine = make_engine(url, tuned)
+    rng = np.random.default_rng(os.getpid())
+    latencies, errors = [], 0
+    with engine.connect() as connection:
+        time.sleep(max(0.0, start_at - time.time()))
+        while time.time() < start_at + duration:
+            start = time.perf_counter()
+            try:
+                if role == "write":
+                    write_spin(connection, rng)
+                else:
+                    read_dashboard(connection)
+                latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                # "database is locked" once the busy timeout runs out
+                errors += 1
+                connection.rollback()
+    engine.dispose()
+    results.put((role, latencies, errors))
+
+
+def run(url, tuned, writers, readers, duration):
+    """Runs writer and reader processes together; returns stats per role."""
+    results = multiprocessing.Queue()
+    start_at = time.time() + 1.0
+    processes = [
+        multiprocessing.Process(target=worker, args=(role, url, tuned, start_at, duration, results))
+        for role in ["write"] * writers + ["read"] * readers
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    stats = {}
+    for role in ("write", "read"):
+        latencies = np.array([l for r, ls, _ in collected if r == role for l in ls]) * 1000
+        stats[role] = {
+            "ops_per_second": len(latencies) / duration,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            "max_ms": float(latencies.max()) if len(latencies) else None,
+            "errors": sum(e for r, _, e in collected if r == role)
+        }
+    return stats
+
+
+# Concurrent process_spin writes and dashboard reads, with library defaults and tuned engines.
+# Usage: python -m src.concurrency_benchmark [writers] [readers] [seconds] [database url]
+# With a PostgreSQL URL the database must be empty; SQLite files are recreated.
+if __name__ == "__main__":
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    url = sys.argv[4] if len(sys.argv) > 4 else "sqlite:////tmp/concurrency_benchmark.db"
+
+    print(f"{writers} writers ({BETS_PER_SPIN} bets per spin), {readers} readers, {duration:g}s")
+    print(f"{'engine':>8} {'role':>6} {'ops/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>9} {'errors':>7}")
+    for tuned in (False, True):
+        if url.startswith("sqlite:///"):
+            path = url[len("sqlite:///"):]
+            for suffix in ("", "-wal", "-shm", "-journal"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        engine = make_engine(url, tuned)
+        db.metadata.drop_all(engine)
+        db.metadata.create_all(engine)
+        with engine.begin() as connection:
+            # Existing history, so reads do real work
+            populate(connection, user_count=2, bets_per_user=100_000, days=60)
+        engine.dispose()
+
+        for role, stats in run(url, tuned, writers, readers, duration).items():
+            print(f"{'tuned' if tuned else 'default':>8} {role:>6} {stats['ops_per_second']:>8.1f} "
+                  f"{stats['p50_ms'] or 0:>8.1f} {stats['p99_ms'] or 0:>8.1f} {stats['max_ms'] or 0:>9.1f} "
+                  f"{stats['errors']:>7}")
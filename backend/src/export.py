@@ -0,0 +1,262 @@
+import csv
+import heapq
+import io
+from datetime import date, datetime, time, timedelta
+from importlib.util import find_spec
+import numpy as np
+from sqlalchemy import select
+
+# Rows fetched from the database (and written) per chunk
+EXPORT_BATCH_SIZE = 10_000
+# Longest period of a report export, in days
+MAX_REPORT_DAYS = 3650
+# Data rows per XLSX sheet (Excel's limit is 1,048,576 rows, header included)
+XLSX_MAX_ROWS = 1_048_575
+
+# Format: (mimetype, file extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+# Formats sent while they are written; the others are built by an export job (see export_jobs)
+STREAMED_FORMATS = ('csv',)
+
+# Exported columns: (name, kind); kind is 'int', 'float', 'text', 'time' or 'date'
+BET_COLUMNS = [
+    ('id', 'int'), ('strategy_id', 'int'), ('betting_house', 'text'), ('roulette_type', 'text'),
+    ('table_id', 'text'), ('bet_time', 'time'), ('bet_amount', 'float'), ('bet_numbers', 'text'),
+    ('outcome_number', 'int'), ('profit_loss', 'float'), ('status', 'text'),
+]
+DAILY_PROFIT_COLUMNS = [
+    ('date', 'date'), ('daily_profit', 'float'), ('cumulative_profit', 'float'), ('bet_count', 'int'),
+]
+STRATEGY_PERFORMANCE_COLUMNS = [
+    ('strategy_id', 'int'), ('total_profit', 'float'), ('total_stake', 'float'), ('total_bets', 'int'),
+    ('winning_bets', 'int'), ('losing_bets', 'int'), ('win_rate', 'float'), ('avg_profit_per_bet', 'float'),
+]
+
+
+class ExportUnavailable(Exception):
+    """The format needs a library that is not installed."""
+
+
+def check_format(export_format):
+    """Raises ValueError for an unknown format and ExportUnavailable when it cannot be written here."""
+    if export_format not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    if export_format == 'parquet' and find_spec('pyarrow') is None:
+        raise ExportUnavailable('Parquet export requires pyarrow, which is not installed')
+
+
+def stream_export(columns, batches):
+    """Yields the bytes of a CSV export, given its rows in batches (lists of tuples)."""
+    return _csv_chunks(columns, batches)
+
+
+def save_export(export_format, columns, batches, path):
+    """Writes an export file to `path`, given its rows in batches (lists of tuples)."""
+    if export_format == 'csv':
+        with open(path, 'wb') as file:
+            for chunk in _csv_chunks(columns, batches):
+                file.write(chunk)
+    elif export_format == 'xlsx':
+        _save_xlsx(columns, batches, path)
+    else:
+        _save_parquet(columns, batches, path)
+
+
+def _csv_chunks(columns, batches):
+    """CSV written one batch at a time; times as ISO 8601."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    dated = [index for index, (_, kind) in enumerate(columns) if kind in ('time', 'date')]
+    for batch in batches:
+        if dated:
+            batch = [list(row) for row in batch]
+            for row in batch:
+                for index in dated:
+                    if row[index] is not None:
+                        row[index] = row[index].isoformat()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _save_xlsx(columns, batches, path):
+    """XLSX built in openpyxl's write-only mode (rows go to disk, not memory).
+    Rows beyond the sheet limit continue on new sheets."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    header = [name for name, _ in columns]
+    sheet, rows = None, XLSX_MAX_ROWS
+    for batch in batches:
+        for row in batch:
+            if rows == XLSX_MAX_ROWS:
+                sheet = workbook.create_sheet(f'Sheet{len(workbook.sheetnames) + 1}')
+                sheet.append(header)
+                rows = 0
+            sheet.append(row)
+            rows += 1
+    if sheet is None:
+        workbook.create_sheet('Sheet1').append(header)
+    workbook.save(path)
+
+
+def _save_parquet(columns, batches, path):
+    """Parquet written one row group per batch with pyarrow."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {'int': pa.int64(), 'float': pa.float64(), 'text': pa.string(),
+             'time': pa.timestamp('us'), 'date': pa.date32()}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        for batch in batches:
+            arrays = [[row[index] for row in batch] for index in range(len(columns))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+def _batched(rows):
+    """Lists of EXPORT_BATCH_SIZE rows from an iterable of rows."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _archived_bet_rows(session, user_id, strategy_id, start, end):
+    """BET_COLUMNS rows of the archived bets of a user, by bet_time (sorted one month at a time)."""
+    from src.archive import archived_bets
+
+    for columns in archived_bets(session, user_id, start, end):
+        selected = np.ones(len(columns['id']), dtype=bool)
+        if strategy_id is not None:
+            selected &= columns['strategy_id'] == int(strategy_id)
+        order = np.lexsort((columns['id'], columns['bet_time']))
+        order = order[selected[order]]
+        # Back from the archive's NULL markers: -1 (outcome_number) and NaN
+        values = []
+        for name, kind in BET_COLUMNS:
+            column = columns[name][order].tolist()
+            if name == 'outcome_number':
+                column = [None if v == -1 else v for v in column]
+            elif kind == 'float':
+                column = [None if v != v else v for v in column]
+            values.append(column)
+        yield from zip(*values)
+
+
+def bet_batches(session, user_id, strategy_id=None, start_date=None, end_date=None):
+    """The bets of a user between two days (inclusive), oldest first, in batches of BET_COLUMNS rows.
+    Archived bets and the bet table are read in chunks and merged by bet time."""
+    from src.models.bet import Bet
+
+    start = datetime.combine(start_date, time.min) if start_date else None
+    end = datetime.combine(end_date, time.max) if end_date else None
+
+    query = select(*(getattr(Bet, name) for name, _ in BET_COLUMNS)).where(Bet.user_id == user_id)
+    if strategy_id is not None:
+        query = query.where(Bet.strategy_id == strategy_id)
+    if start is not None:
+        query = query.where(Bet.bet_time >= start)
+    if end is not None:
+        query = query.where(Bet.bet_time <= end)
+    query = query.order_by(Bet.bet_time, Bet.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    live = (tuple(row) for row in session.execute(query))
+
+    # Pending bets are never archived, so live bets can be older than archived ones
+    archived = _archived_bet_rows(session, user_id, strategy_id, start, end)
+    yield from _batched(heapq.merge(archived, live, key=lambda row: (row[5], row[0])))
+
+
+def daily_profit_batches(session, user_id, start_date, end_date):
+    """One DAILY_PROFIT_COLUMNS row per day between two days (inclusive), days without bets at zero."""
+    from src.models.profit_report import daily_totals_query
+
+    query = daily_totals_query(user_id, start_date, end_date)
+
+    batch, cumulative, day = [], 0.0, start_date
+    for report_date, profit, bets in session.execute(query):
+        while day <= report_date:
+            daily = (float(profit), int(bets)) if day == report_date else (0.0, 0)
+            cumulative += daily[0]
+            batch.append((day, daily[0], cumulative, daily[1]))
+            day += timedelta(days=1)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    while day <= end_date:
+        batch.append((day, 0.0, cumulative, 0))
+        day += timedelta(days=1)
+    if batch:
+        yield batch
+
+
+def strategy_performance_batches(session, user_id, start_date, end_date):
+    """One STRATEGY_PERFORMANCE_COLUMNS row per strategy with settled bets between two days (inclusive)."""
+    from src.models.profit_report import strategy_totals
+
+    batch = []
+    for row in strategy_totals(session, user_id, start_date, end_date):
+        total_profit = float(row.total_profit)
+        batch.append((
+            row.strategy_id, total_profit, float(row.total_stake), row.total_bets, row.winning_bets,
+            row.losing_bets, row.winning_bets / row.total_bets * 100, total_profit / row.total_bets
+        ))
+    yield batch
+
+
+def report_period(start_date=None, end_date=None, days=None):
+    """Days covered by a report export (dates as YYYY-MM-DD): start_date/end_date, or the `days` days
+    up to end_date (default today, 30 days). Raises ValueError for invalid or too long periods."""
+    end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else date.today()
+    if start_date:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    else:
+        try:
+            days = int(days) if days is not None else 30
+        except ValueError:
+            raise ValueError('days must be a whole number')
+        if not 1 <= days <= MAX_REPORT_DAYS:
+            raise ValueError(f'days must be between 1 and {MAX_REPORT_DAYS}')
+        if end.toordinal() <= days:
+            raise ValueError('days reaches before year 1')
+        start = end - timedelta(days=days)
+    if start > end:
+        raise ValueError('start_date must not be after end_date')
+    if (end - start).days > MAX_REPORT_DAYS:
+        raise ValueError(f'A report export covers at most {MAX_REPORT_DAYS} days')
+    return start, end
+
+
+# Export name: (columns, function giving the row batches of an export from its parameters)
+EXPORTS = {
+    'bets': (BET_COLUMNS, lambda session, params: bet_batches(
+        session, params['user_id'], params.get('strategy_id'),
+        date.fromisoformat(params['start_date']) if params.get('start_date') else None,
+        date.fromisoformat(params['end_date']) if params.get('end_date') else None
+    )),
+    'daily-profit': (DAILY_PROFIT_COLUMNS, lambda session, params: daily_profit_batches(
+        session, params['user_id'], date.fromisoformat(params['start_date']), date.fromisoformat(params['end_date'])
+    )),
+    'strategy-performance': (STRATEGY_PERFORMANCE_COLUMNS, lambda session, params: strategy_performance_batches(
+        session, params['user_id'], date.fromisoformat(params['start_date']), date.fromisoformat(params['end_date'])
+    )),
+}
+
+
+def export_batches(session, name, params):
+    """Columns and row batches of an export, given its name in EXPORTS and its parameters
+    (user_id, and strategy_id, start_date, end_date as they apply; dates as YYYY-MM-DD)."""
+    columns, batches = EXPORTS[name]
+    return columns, batches(session, params)
@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from src.export import FORMATS, export_batches, save_export
+
+# Where finished export files are kept (next to the SQLite database by default)
+EXPORT_DIR = os.environ.get("EXPORT_DIR", os.path.join(os.path.dirname(__file__), "database", "exports"))
+# Background threads per app process building export files
+DEFAULT_EXPORT_WORKERS = int(os.environ.get("EXPORT_JOB_WORKERS", "1"))
+# Finished export files are deleted after this many hours
+EXPORT_KEEP_HOURS = int(os.environ.get("EXPORT_KEEP_HOURS", "24"))
+
+
+def export_path(job):
+    """Path of the file of an export job."""
+    return os.path.join(EXPORT_DIR, f"{job.id}.{FORMATS[job.format][1]}")
+
+
+class ExportJobRunner:
+    """Builds the files of ExportJob rows on a background thread pool.
+
+    XLSX and Parquet files can only be sent once they are complete, which
+    takes minutes for millions of bets, so requests only insert the job
+    and return; a pool thread writes the file to EXPORT_DIR and the client
+    downloads it when the job is completed.
+    """
+
+    def __init__(self, max_workers=DEFAULT_EXPORT_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = Lock()
+
+    def submit(self, app, job_id):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="export-job")
+        self._executor.submit(self._run, app, job_id)
+
+    def _run(self, app, job_id):
+        from sqlalchemy import update
+        from src.models.user import db
+        from src.models.export_job import ExportJob
+
+        def transition(from_status, **values):
+            changed = db.session.execute(update(ExportJob).where(
+                ExportJob.id == job_id, ExportJob.status == from_status
+            ).values(**values)).rowcount
+            db.session.commit()
+            return changed == 1
+
+        with app.app_context():
+            path = None
+            try:
+                expire_exports(db.session)
+                db.session.commit()
+                job = ExportJob.query.get(job_id)
+                if job is None or not transition('queued', status='running'):
+                    return
+                db.session.refresh(job)
+
+                path = export_path(job)
+                os.makedirs(EXPORT_DIR, exist_ok=True)
+                columns, batches = export_batches(db.session, job.export, dict(job.get_params(), user_id=job.user_id))
+                save_export(job.format, columns, batches, path + ".tmp")
+                os.replace(path + ".tmp", path)
+                transition('running', status='completed', file_size=os.path.getsize(path),
+                           finished_at=datetime.utcnow())
+            except Exception as e:
+                db.session.rollback()
+                db.session.execute(update(ExportJob).where(
+                    ExportJob.id == job_id, ExportJob.status.in_(('queued', 'running'))
+                ).values(status='failed', error=str(e), finished_at=datetime.utcnow()))
+                db.session.commit()
+                if path is not None and os.path.exists(path + ".tmp"):
+                    os.remove(path + ".tmp")
+            finally:
+                db.session.remove()
+
+
+def expire_exports(session, now=None):
+    """Deletes the files of exports finished more than EXPORT_KEEP_HOURS ago and marks them expired.
+    Returns the number of jobs expired. The caller commits."""
+    from src.models.export_job import ExportJob
+
+    cutoff = (now or datetime.utcnow()) - timedelta(hours=EXPORT_KEEP_HOURS)
+    jobs = session.query(ExportJob).filter(ExportJob.status == 'completed', ExportJob.finished_at < cutoff).all()
+    for job in jobs:
+        try:
+            os.remove(export_path(job))
+        except FileNotFoundError:
+            pass
+        job.status = 'expired'
+    return len(jobs)
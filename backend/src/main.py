@@ -3,19 +3,30 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+import click
 from flask import Flask, send_from_directory
 from flask_cors import CORS
 from src.models.user import db
 from src.models.strategy import Strategy
 from src.models.bet import Bet
-from src.models.profit_report import ProfitReport
+from src.models.profit_report import ProfitReport, rebuild_profit_reports
+from src.models.spin import Spin
+from src.models.simulation_job import SimulationJob
+from src.models.export_job import ExportJob
+from src.models.migrations import upgrade_schema, backfill_bet_encoding
+from src.models.engine import engine_options, tune_engine
+from src.archive import archive_history, ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+from src.simulation_jobs import fail_orphaned_jobs
 from src.routes.user import user_bp
 from src.routes.strategy import strategy_bp
 from src.routes.bet import bet_bp
 from src.routes.report import report_bp
-from src.routes.automation import automation_bp
+from src.routes.automation import automation_bp, table_history
 from src.routes.betfair import betfair_bp
 from src.routes.schedule import schedule_bp
+from src.routes.backtest import backtest_bp
+from src.routes.simulation import simulation_bp
+from src.routes.export import export_bp
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -30,15 +41,49 @@ app.register_blueprint(report_bp, url_prefix='/api')
 app.register_blueprint(automation_bp, url_prefix='/api')
 app.register_blueprint(betfair_bp, url_prefix='/api')
 app.register_blueprint(schedule_bp, url_prefix='/api')
+app.register_blueprint(backtest_bp, url_prefix='/api')
+app.register_blueprint(simulation_bp, url_prefix='/api')
+app.register_blueprint(export_bp, url_prefix='/api')
 
 # Database configuration
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
 
 db.init_app(app)
 with app.app_context():
+    tune_engine(db.engine)
     db.create_all()
+    upgrade_schema(db)
+    # Jobs of processes that died (restart, crash) can never finish
+    fail_orphaned_jobs(db.session)
+    fail_orphaned_jobs(db.session, ExportJob)
+    db.session.commit()
+    # Strategy history is served from memory; reload the latest spins of every table
+    table_history.rehydrate()
 
+@app.cli.command('rebuild-profit-reports')
+@click.option('--user-id', type=int, default=None, help='Only rebuild the reports of this user')
+def rebuild_profit_reports_command(user_id):
+    """Recompute the daily profit rollups from the bet table"""
+    rows = rebuild_profit_reports(db.session, user_id)
+    db.session.commit()
+    click.echo(f'Rebuilt {rows} profit report rows')
+
+@app.cli.command('backfill-bet-encoding')
+@click.option('--batch-size', type=int, default=10_000, help='Bets encoded per transaction')
+def backfill_bet_encoding_command(batch_size):
+    """Encode bet_numbers of existing bets as coverage mask and stake in cents"""
+    encoded = backfill_bet_encoding(db, batch_size, progress=lambda done: click.echo(f'{done} bets encoded'))
+    click.echo(f'Done: {encoded} bets encoded')
+
+@app.cli.command('archive-history')
+@click.option('--older-than-days', type=int, default=ARCHIVE_AFTER_DAYS, help='Archive settled bets and spins older than this')
+@click.option('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Rows moved per transaction')
+def archive_history_command(older_than_days, batch_size):
+    """Move old settled bets and spins to the compressed archive"""
+    moved = archive_history(db, older_than_days, batch_size)
+    click.echo(f"Archived {moved['bets']} bets and {moved['spins']} spins")
 
 
 @app.route('/', defaults={'path': ''})
@@ -1,17 +1,71 @@
-from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+import json
+from sqlalchemy import select, tuple_
+from src.models.user import db
+from src.strategies.numset import NumSet
 
-db = SQLAlchemy()
+# Straight-up bets pay 35 to 1 (profit only, the stake comes back on top)
+STRAIGHT_UP_PAYOUT = 35
+
+def encode_bet_numbers(bet_numbers, bet_amount):
+    """Compact form of a bet: (coverage_mask, stake_cents).
+
+    coverage_mask has bit n set for every covered number n (the NumSet
+    mask) and stake_cents is the stake in integer cents. stake_cents is
+    None when the stake is not a whole number of cents: rounding it would
+    settle a different stake than bet_amount, which the rollups count, so
+    such bets are settled on bet_amount. Returns (None, None) when
+    bet_numbers is not a JSON list of numbers 0-36.
+    """
+    try:
+        numbers = json.loads(bet_numbers) if isinstance(bet_numbers, str) else bet_numbers
+        if not isinstance(numbers, list) or not all(isinstance(number, int) for number in numbers):
+            return None, None
+        cents = round(bet_amount * 100)
+        if abs(bet_amount * 100 - cents) > 1e-6:
+            cents = None
+        return NumSet(numbers).mask, cents
+    except (ValueError, TypeError):
+        return None, None
+
+def bets_query(user_id, strategy_id=None, start=None, end=None, after=None):
+    """Select statement for the bets of a user, newest first (bet_time, then id, descending).
+    after: (bet_time, id) of a keyset cursor; only bets after it in that order are selected.
+    """
+    query = select(Bet).where(Bet.user_id == user_id)
+    if strategy_id is not None:
+        query = query.where(Bet.strategy_id == strategy_id)
+    if start is not None:
+        query = query.where(Bet.bet_time >= start)
+    if end is not None:
+        query = query.where(Bet.bet_time <= end)
+    if after is not None:
+        # Keyset: a row-value comparison the (user_id, bet_time) indexes serve
+        query = query.where(tuple_(Bet.bet_time, Bet.id) < after)
+    return query.order_by(Bet.bet_time.desc(), Bet.id.desc())
 
 class Bet(db.Model):
+    # Every hot query filters on user_id and a bet_time range. The first index
+    # also carries the columns the reports aggregate, so they never touch the table
+    __table_args__ = (
+        db.Index('ix_bet_user_time', 'user_id', 'bet_time', 'strategy_id', 'profit_loss'),
+        db.Index('ix_bet_user_strategy_time', 'user_id', 'strategy_id', 'bet_time'),
+        # Spin settlement looks up the few pending bets of one table (or user stream)
+        db.Index('ix_bet_pending_table', 'status', 'betting_house', 'table_id', 'user_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     strategy_id = db.Column(db.Integer, db.ForeignKey('strategy.id'), nullable=False)
     betting_house = db.Column(db.String(50), nullable=False)  # 'betfair', '1pra1bet', 'sportingbet'
     roulette_type = db.Column(db.String(50), nullable=False)  # 'evolution', 'playtech'
+    table_id = db.Column(db.String(100), nullable=True)  # Table / market the bet was generated for
+    spin_id = db.Column(db.Integer, nullable=True)  # Spin that generated the bet (placed on the next one); no FK, spins get archived
     bet_time = db.Column(db.DateTime, default=datetime.utcnow)
     bet_amount = db.Column(db.Float, nullable=False)
     bet_numbers = db.Column(db.Text, nullable=False)  # JSON string with bet details
+    coverage_mask = db.Column(db.BigInteger, nullable=True)  # Bit n set if number n is covered (encode_bet_numbers)
+    stake_cents = db.Column(db.Integer, nullable=True)  # Stake in cents; NULL until migrated, or for sub-cent stakes
     outcome_number = db.Column(db.Integer, nullable=True)  # The winning number
     profit_loss = db.Column(db.Float, default=0.0)  # Positive for profit, negative for loss
     status = db.Column(db.String(20), default='pending')  # 'pending', 'won', 'lost'
@@ -19,6 +73,19 @@ class Bet(db.Model):
     def __repr__(self):
         return f'<Bet {self.id} - {self.status}>'
 
+    def covers(self, number):
+        """True if the bet covers a number (mask test; JSON only for rows not yet migrated)."""
+        if self.coverage_mask is not None:
+            return number >= 0 and (self.coverage_mask >> number) & 1 == 1
+        return number in json.loads(self.bet_numbers)
+
+    def profit_on(self, number):
+        """Profit or loss of the bet if `number` comes out."""
+        if self.stake_cents is not None:
+            cents = self.stake_cents * STRAIGHT_UP_PAYOUT if self.covers(number) else -self.stake_cents
+            return cents / 100
+        return self.bet_amount * STRAIGHT_UP_PAYOUT if self.covers(number) else -self.bet_amount
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -26,6 +93,8 @@ class Bet(db.Model):
             'strategy_id': self.strategy_id,
             'betting_house': self.betting_house,
             'roulette_type': self.roulette_type,
+            'table_id': self.table_id,
+            'spin_id': self.spin_id,
             'bet_time': self.bet_time.isoformat() if self.bet_time else None,
             'bet_amount': self.bet_amount,
             'bet_numbers': self.bet_numbers,
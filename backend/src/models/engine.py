@@ -0,0 +1,48 @@
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Seconds a SQLite connection waits for a lock before raising "database is locked"
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("SQLITE_BUSY_TIMEOUT", "30"))
+# PostgreSQL connections kept per app process, and extra ones allowed under load
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "20"))
+# Connections older than this (seconds) are replaced, before servers or proxies drop them
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+
+
+def engine_options(database_url):
+    """create_engine options for a database URL (SQLALCHEMY_ENGINE_OPTIONS)."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        # Pool connections move between request threads
+        return {"connect_args": {"timeout": SQLITE_BUSY_TIMEOUT, "check_same_thread": False}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        # Checks each connection on checkout, so a restarted server costs no failed request
+        "pool_pre_ping": True,
+    }
+
+
+def tune_engine(engine):
+    """Sets the per-connection SQLite pragmas; other databases need nothing.
+
+    WAL lets readers run while a write is in progress (the default rollback
+    journal blocks them), and synchronous=NORMAL syncs to disk at checkpoints
+    instead of on every commit, which is safe in WAL mode. Call before the
+    engine opens its first connection.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    in_memory = engine.url.database in (None, "", ":memory:")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT * 1000)}")
+        cursor.close()
@@ -0,0 +1,38 @@
+from datetime import datetime
+from src.models.user import db
+import json
+
+class ExportJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    export = db.Column(db.String(50), nullable=False)  # 'bets', 'daily-profit', 'strategy-performance'
+    format = db.Column(db.String(20), nullable=False)  # 'xlsx', 'parquet'
+    params_json = db.Column(db.Text, nullable=True)  # JSON string with the export parameters
+    status = db.Column(db.String(20), default='queued')  # 'queued', 'running', 'completed', 'failed', 'expired'
+    runner = db.Column(db.String(120), nullable=True)  # "host:pid" of the process running the job
+    file_size = db.Column(db.BigInteger, nullable=True)  # Bytes of the finished file
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<ExportJob {self.id} - {self.status}>'
+
+    def get_params(self):
+        """Get parameters as dictionary"""
+        return json.loads(self.params_json) if self.params_json else {}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'export': self.export,
+            'format': self.format,
+            'params': self.get_params(),
+            'status': self.status,
+            'file_size': self.file_size,
+            'download_url': f'/api/exports/jobs/{self.id}/download' if self.status == 'completed' else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
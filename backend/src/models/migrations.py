@@ -0,0 +1,96 @@
+from sqlalchemy import inspect, text, select, update, bindparam
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
+
+# (table, column, DDL type) added to existing tables after their first release
+ADDED_COLUMNS = [
+    ("spin", "market_version", "BIGINT"),
+    ("profit_report", "strategy_id", "INTEGER"),
+    ("profit_report", "total_stake", "FLOAT"),
+    ("bet", "table_id", "VARCHAR(100)"),
+    ("bet", "coverage_mask", "BIGINT"),
+    ("bet", "stake_cents", "INTEGER"),
+    ("bet", "spin_id", "INTEGER"),
+    ("simulation_job", "runner", "VARCHAR(120)"),
+]
+
+
+def upgrade_schema(db):
+    """Brings an existing database up to the current models.
+
+    db.create_all() only creates missing tables, so columns and indexes
+    added to existing tables are created here. Every step checks first, so
+    it is safe to run on every startup. Building an index on a large table
+    takes a while, so the first start after an upgrade is slower.
+    Returns the names of the indexes created.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    created = []
+    for table, column, ddl in ADDED_COLUMNS:
+        if inspector.has_table(table) and column not in {c["name"] for c in inspector.get_columns(table)}:
+            _add_column(engine, table, column, ddl)
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    # IF NOT EXISTS: several app processes may start at once
+                    connection.execute(CreateIndex(index, if_not_exists=True))
+                    created.append(index.name)
+    return created
+
+
+def _add_column(engine, table, column, ddl):
+    """ALTER TABLE ... ADD COLUMN in its own transaction. Several app processes may
+    start at once, so a column another process added meanwhile is not an error."""
+    if_not_exists = "IF NOT EXISTS " if engine.dialect.name == "postgresql" else ""
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {if_not_exists}{column} {ddl}"))
+    except DBAPIError:
+        # SQLite has no IF NOT EXISTS for columns: "duplicate column" once another process won
+        if column not in {c["name"] for c in inspect(engine).get_columns(table)}:
+            raise
+
+
+def backfill_bet_encoding(db, batch_size=10_000, progress=None):
+    """Fills coverage_mask and stake_cents of bets stored before they existed.
+
+    Walks the bet table by id in batches, each one read, encoded and
+    written back in its own short transaction, so the app keeps running
+    while it goes. Rows whose bet_numbers is not a JSON list of wheel
+    numbers are left without a mask. Safe to stop and run again.
+    progress: optional callable receiving the number of rows done so far
+    Returns the number of rows encoded.
+    """
+    from src.models.bet import Bet, encode_bet_numbers
+
+    bet = Bet.__table__
+    encode = update(bet).where(bet.c.id == bindparam("bet_id")).values(
+        coverage_mask=bindparam("mask"), stake_cents=bindparam("cents")
+    )
+    last_id, encoded = 0, 0
+    while True:
+        with db.engine.begin() as connection:
+            rows = connection.execute(
+                select(bet.c.id, bet.c.bet_numbers, bet.c.bet_amount)
+                .where(bet.c.id > last_id, bet.c.coverage_mask.is_(None))
+                .order_by(bet.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                return encoded
+            last_id = rows[-1].id
+            params = []
+            for row in rows:
+                mask, cents = encode_bet_numbers(row.bet_numbers, row.bet_amount)
+                if mask is not None:
+                    params.append({"bet_id": row.id, "mask": mask, "cents": cents})
+            if params:
+                connection.execute(encode, params)
+            encoded += len(params)
+        if progress:
+            progress(encoded)
@@ -1,15 +1,33 @@
-from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, date
+from sqlalchemy import update, insert, delete, select, func, case, literal, bindparam, tuple_
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db
 
-db = SQLAlchemy()
+# Bet statuses counted in the rollups; pending bets have no result yet
+SETTLED_STATUSES = ('won', 'lost')
+# Rollup columns a settled bet adds to
+ROLLUP_COLUMNS = ('daily_profit', 'total_stake', 'total_bets', 'winning_bets', 'losing_bets')
 
 class ProfitReport(db.Model):
+    """Daily rollup of the settled bets of one strategy.
+
+    One row per (user, strategy, day), kept up to date in the same
+    transaction that settles a bet, so reports read one row per day and
+    strategy instead of every bet.
+    """
+    __table_args__ = (
+        db.Index('ix_profit_report_user_strategy_day', 'user_id', 'strategy_id', 'report_date', unique=True),
+        db.Index('ix_profit_report_user_day', 'user_id', 'report_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    strategy_id = db.Column(db.Integer, db.ForeignKey('strategy.id'), nullable=True)  # Nullable: added after the first release
     report_date = db.Column(db.Date, default=date.today)
     daily_profit = db.Column(db.Float, default=0.0)
     weekly_profit = db.Column(db.Float, default=0.0)
     monthly_profit = db.Column(db.Float, default=0.0)
+    total_stake = db.Column(db.Float, default=0.0)
     total_bets = db.Column(db.Integer, default=0)
     winning_bets = db.Column(db.Integer, default=0)
     losing_bets = db.Column(db.Integer, default=0)
@@ -23,10 +41,12 @@ class ProfitReport(db.Model):
         return {
             'id': self.id,
             'user_id': self.user_id,
+            'strategy_id': self.strategy_id,
             'report_date': self.report_date.isoformat() if self.report_date else None,
             'daily_profit': self.daily_profit,
             'weekly_profit': self.weekly_profit,
             'monthly_profit': self.monthly_profit,
+            'total_stake': self.total_stake,
             'total_bets': self.total_bets,
             'winning_bets': self.winning_bets,
             'losing_bets': self.losing_bets,
@@ -35,3 +55,161 @@ class ProfitReport(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+def settlement_snapshot(bet):
+    """What a bet adds to its rollup row: (key, totals), or None while it is unsettled.
+    Take one before changing a bet and one after, then pass both to apply_settlement.
+    """
+    if bet.status not in SETTLED_STATUSES:
+        return None
+    profit = bet.profit_loss or 0.0
+    key = (bet.user_id, bet.strategy_id, (bet.bet_time or datetime.utcnow()).date())
+    return key, {
+        'daily_profit': profit,
+        'total_stake': bet.bet_amount,
+        'total_bets': 1,
+        'winning_bets': 1 if profit > 0 else 0,
+        'losing_bets': 1 if profit < 0 else 0
+    }
+
+def apply_settlement(session, before, after):
+    """Moves a bet's rollup contribution from `before` to `after` (settlement_snapshot values).
+    Runs in the caller's transaction; nothing is committed here.
+    """
+    deltas = {}
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot is None:
+            continue
+        key, totals = snapshot
+        delta = deltas.setdefault(key, dict.fromkeys(totals, 0))
+        for column, amount in totals.items():
+            delta[column] += sign * amount
+    apply_rollup_deltas(session, deltas)
+
+def apply_rollup_deltas(session, deltas):
+    """Adds {(user_id, strategy_id, report_date): {column: amount}} to the rollup rows,
+    creating missing ones. Runs in the caller's transaction; nothing is committed here.
+    Takes one SELECT, one executemany UPDATE and one bulk INSERT however many rows change.
+    """
+    table = ProfitReport.__table__
+    key_columns = (table.c.user_id, table.c.strategy_id, table.c.report_date)
+    # Added in SQL, so concurrent settlements on the same day never overwrite each other
+    increment = update(table).where(
+        *(column == bindparam(f'key_{column.name}') for column in key_columns)
+    ).values(
+        updated_at=bindparam('now'),
+        **{column: table.c[column] + bindparam(f'add_{column}') for column in ROLLUP_COLUMNS}
+    )
+
+    pending = {key: delta for key, delta in deltas.items() if any(delta.values())}
+    while pending:
+        now = datetime.utcnow()
+        existing = set(session.execute(select(*key_columns).where(tuple_(*key_columns).in_(list(pending)))).all())
+        if existing:
+            session.execute(increment, [
+                dict(
+                    key_user_id=key[0], key_strategy_id=key[1], key_report_date=key[2], now=now,
+                    **{f'add_{column}': pending[key][column] for column in ROLLUP_COLUMNS}
+                ) for key in pending if key in existing
+            ])
+        missing = [key for key in pending if key not in existing]
+        try:
+            if missing:
+                with session.begin_nested():
+                    session.execute(insert(table), [
+                        dict(user_id=key[0], strategy_id=key[1], report_date=key[2], **pending[key])
+                        for key in missing
+                    ])
+            return
+        except IntegrityError:
+            # Another transaction created some of these rows first: add to them instead
+            pending = {key: pending[key] for key in missing}
+
+def rebuild_profit_reports(session, user_id=None):
+    """Recomputes the rollups from the bet table and the archived bets (all users, or one).
+    Returns the number of rollup rows written; the caller commits.
+    """
+    from src.models.bet import Bet
+    from src.archive import archived_bet_totals
+
+    clear = delete(ProfitReport)
+    settled = select(
+        Bet.user_id,
+        Bet.strategy_id,
+        func.date(Bet.bet_time),
+        func.sum(Bet.profit_loss),
+        func.sum(Bet.bet_amount),
+        func.count(Bet.id),
+        func.sum(case((Bet.profit_loss > 0, 1), else_=0)),
+        func.sum(case((Bet.profit_loss < 0, 1), else_=0)),
+        literal(0.0),
+        literal(0.0),
+        literal(datetime.utcnow()),
+        literal(datetime.utcnow())
+    ).where(Bet.status.in_(SETTLED_STATUSES)).group_by(
+        Bet.user_id, Bet.strategy_id, func.date(Bet.bet_time)
+    )
+    if user_id is not None:
+        clear = clear.where(ProfitReport.user_id == user_id)
+        settled = settled.where(Bet.user_id == user_id)
+
+    session.execute(clear)
+    session.execute(insert(ProfitReport).from_select([
+        'user_id', 'strategy_id', 'report_date', 'daily_profit', 'total_stake', 'total_bets',
+        'winning_bets', 'losing_bets', 'weekly_profit', 'monthly_profit', 'created_at', 'updated_at'
+    ], settled))
+    apply_rollup_deltas(session, archived_bet_totals(session, user_id))
+
+    written = select(func.count(ProfitReport.id))
+    if user_id is not None:
+        written = written.where(ProfitReport.user_id == user_id)
+    return session.execute(written).scalar()
+
+def strategy_totals_query(user_id, start_date=None, end_date=None):
+    """The GROUP BY statement behind strategy_totals."""
+    query = select(
+        ProfitReport.strategy_id,
+        func.sum(ProfitReport.daily_profit).label('total_profit'),
+        func.sum(ProfitReport.total_stake).label('total_stake'),
+        func.sum(ProfitReport.total_bets).label('total_bets'),
+        func.sum(ProfitReport.winning_bets).label('winning_bets'),
+        func.sum(ProfitReport.losing_bets).label('losing_bets')
+    ).where(ProfitReport.user_id == user_id)
+    if start_date is not None:
+        query = query.where(ProfitReport.report_date >= start_date)
+    if end_date is not None:
+        query = query.where(ProfitReport.report_date <= end_date)
+    # Rows left at zero by bets moved back to pending are skipped
+    return query.group_by(ProfitReport.strategy_id).having(func.sum(ProfitReport.total_bets) > 0)
+
+def strategy_totals(session, user_id, start_date=None, end_date=None):
+    """Per-strategy sums of the daily rollups between two days (inclusive), in one GROUP BY query.
+    Rows have strategy_id, total_profit, total_stake, total_bets, winning_bets and losing_bets.
+    """
+    return session.execute(strategy_totals_query(user_id, start_date, end_date)).all()
+
+def daily_totals_query(user_id, start_date, end_date):
+    """Rollups summed over strategies per day between two days (inclusive), by day.
+    Rows have bet_date, daily_profit and bet_count; days without settled bets are missing.
+    """
+    return select(
+        ProfitReport.report_date.label('bet_date'),
+        func.sum(ProfitReport.daily_profit).label('daily_profit'),
+        func.sum(ProfitReport.total_bets).label('bet_count')
+    ).where(
+        ProfitReport.user_id == user_id,
+        ProfitReport.report_date >= start_date,
+        ProfitReport.report_date <= end_date
+    ).group_by(ProfitReport.report_date).order_by(ProfitReport.report_date)
+
+def user_totals_query(user_id, start_date=None):
+    """One row of rollup sums of a user from a day on (all days if None), zeros when empty:
+    total_bets, total_profit, winning_bets and losing_bets."""
+    query = select(
+        func.coalesce(func.sum(ProfitReport.total_bets), 0).label('total_bets'),
+        func.coalesce(func.sum(ProfitReport.daily_profit), 0.0).label('total_profit'),
+        func.coalesce(func.sum(ProfitReport.winning_bets), 0).label('winning_bets'),
+        func.coalesce(func.sum(ProfitReport.losing_bets), 0).label('losing_bets')
+    ).where(ProfitReport.user_id == user_id)
+    if start_date is not None:
+        query = query.where(ProfitReport.report_date >= start_date)
+    return query
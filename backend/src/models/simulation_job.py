@@ -0,0 +1,47 @@
+from datetime import datetime
+from src.models.user import db
+import json
+
+class SimulationJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    strategy_type = db.Column(db.String(50), nullable=False)
+    config_json = db.Column(db.Text, nullable=True)  # JSON string with strategy config
+    num_spins = db.Column(db.BigInteger, nullable=False)
+    seed = db.Column(db.String(40), nullable=False)  # Stored as text: numpy seeds exceed 64 bits
+    wheel = db.Column(db.String(20), default='european')
+    cache_key = db.Column(db.String(64), index=True)  # Same key = same result
+    status = db.Column(db.String(20), default='queued')  # 'queued', 'running', 'completed', 'cancelled', 'failed'
+    runner = db.Column(db.String(120), nullable=True)  # "host:pid" of the process running the job
+    spins_done = db.Column(db.BigInteger, default=0)
+    progress_json = db.Column(db.Text, nullable=True)  # Partial statistics while running
+    result_json = db.Column(db.Text, nullable=True)  # Compact final statistics
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<SimulationJob {self.id} - {self.status}>'
+
+    def get_config(self):
+        """Get configuration as dictionary"""
+        return json.loads(self.config_json) if self.config_json else {}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'strategy_type': self.strategy_type,
+            'config': self.get_config(),
+            'num_spins': self.num_spins,
+            'seed': self.seed,
+            'wheel': self.wheel,
+            'status': self.status,
+            'spins_done': self.spins_done,
+            'progress': self.spins_done / self.num_spins if self.num_spins else 1.0,
+            'partial_result': json.loads(self.progress_json) if self.progress_json else None,
+            'result': json.loads(self.result_json) if self.result_json else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,58 @@
+from datetime import datetime
+from src.models.user import db
+from src.roulette_simulator import DOUBLE_ZERO
+
+def parse_spin_number(value):
+    """A reported winning number as an int: 0-36, or DOUBLE_ZERO for 00 (American wheels).
+    Accepts ints and decimal strings ("00" is double zero); raises ValueError otherwise.
+    """
+    number = value
+    if isinstance(value, str):
+        text = value.strip()
+        if text == "00":
+            return DOUBLE_ZERO
+        number = int(text) if text.isdigit() else None
+    if isinstance(number, bool) or not isinstance(number, int) or not 0 <= number <= DOUBLE_ZERO:
+        raise ValueError(f"Invalid winning number: {value!r} (expected 0-36, or 00)")
+    return number
+
+def parse_market_version(value):
+    """A reported market version as an int, or None if not reported.
+    Accepts ints and decimal strings; raises ValueError otherwise."""
+    if value is None:
+        return None
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"Invalid market version: {value!r}")
+    return value
+
+class Spin(db.Model):
+    __table_args__ = (
+        db.Index('ix_spin_table_time', 'betting_house', 'table_id', 'spun_at'),
+        db.Index('ix_spin_user_time', 'user_id', 'spun_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # Set for spins received per user
+    betting_house = db.Column(db.String(50), nullable=False)  # 'betfair', '1pra1bet', 'sportingbet'
+    roulette_type = db.Column(db.String(50), nullable=True)  # 'evolution', 'playtech'
+    table_id = db.Column(db.String(100), nullable=True)  # Table / market id for spins received per table
+    number = db.Column(db.Integer, nullable=False)  # The winning number
+    market_version = db.Column(db.BigInteger, nullable=True)  # Exchange market version, when reported
+    spun_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Spin {self.id} - {self.number}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'betting_house': self.betting_house,
+            'roulette_type': self.roulette_type,
+            'table_id': self.table_id,
+            'number': self.number,
+            'market_version': self.market_version,
+            'spun_at': self.spun_at.isoformat() if self.spun_at else None
+        }
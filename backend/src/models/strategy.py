@@ -1,8 +1,31 @@
-from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, time
 import json
+from src.models.user import db
 
-db = SQLAlchemy()
+def is_within_schedule(schedule_enabled, start_time, end_time, allowed_days, now=None):
+    """Check if `now` falls inside a strategy schedule"""
+    if not schedule_enabled:
+        return True  # Always active if no schedule is set
+    
+    # Get current time (using system timezone for simplicity)
+    now = now or datetime.now()
+    current_time = now.time()
+    current_weekday = now.weekday() + 1  # Monday = 1, Sunday = 7
+    
+    # Check if current day is in allowed days
+    if allowed_days and current_weekday not in allowed_days:
+        return False
+    
+    # Check if current time is within allowed time range
+    if start_time and end_time:
+        if start_time <= end_time:
+            # Same day range (e.g., 09:00 to 18:00)
+            return start_time <= current_time <= end_time
+        else:
+            # Overnight range (e.g., 22:00 to 06:00)
+            return current_time >= start_time or current_time <= end_time
+    
+    return True
 
 class Strategy(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -40,31 +63,8 @@ class Strategy(db.Model):
         if not self.is_active:
             return False
         
-        if not self.schedule_enabled:
-            return True  # Always active if no schedule is set
-        
         try:
-            # Get current time (using system timezone for simplicity)
-            now = datetime.now()
-            current_time = now.time()
-            current_weekday = now.weekday() + 1  # Monday = 1, Sunday = 7
-            
-            # Check if current day is in allowed days
-            allowed_days = self.get_days_of_week()
-            if allowed_days and current_weekday not in allowed_days:
-                return False
-            
-            # Check if current time is within allowed time range
-            if self.start_time and self.end_time:
-                if self.start_time <= self.end_time:
-                    # Same day range (e.g., 09:00 to 18:00)
-                    return self.start_time <= current_time <= self.end_time
-                else:
-                    # Overnight range (e.g., 22:00 to 06:00)
-                    return current_time >= self.start_time or current_time <= self.end_time
-            
-            return True
-            
+            return is_within_schedule(self.schedule_enabled, self.start_time, self.end_time, self.get_days_of_week())
         except Exception as e:
             # If there's any error with time calculation, default to active
             print(f"Error checking schedule for strategy {self.id}: {e}")
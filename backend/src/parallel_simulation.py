@@ -0,0 +1,111 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.strategies.strategy_logic import compile_strategy
+from src.vectorized_simulation import DEFAULT_CHUNK_SIZE, SimulationStats, generate_spins, iter_settlements
+
+DEFAULT_SHARD_SIZE = 1_000_000
+
+
+def shard_seed(master_seed, shard_index):
+    """Seed of a shard; depends only on the master seed and shard position."""
+    return np.random.SeedSequence(master_seed, spawn_key=(shard_index,))
+
+
+def run_shard(strategy_type, config, master_seed, shard_index, num_spins, chunk_size=DEFAULT_CHUNK_SIZE, wheel=None):
+    """Simulates one shard of spins and returns its SimulationStats.
+    Every strategy sees the same spins for a given (master_seed, shard_index).
+    """
+    stats = SimulationStats()
+    stats.spins = num_spins
+    strategy = compile_strategy(strategy_type, config)
+    if strategy is None:
+        return stats
+
+    rng = np.random.default_rng(shard_seed(master_seed, shard_index))
+    chunks = (generate_spins(rng, min(chunk_size, num_spins - start), wheel)
+              for start in range(0, num_spins, chunk_size))
+    template = strategy.template
+    for _, _, _, profits in iter_settlements(strategy, chunks):
+        stats.add(profits, len(template.bets), template.total_stake)
+    return stats
+
+
+def _run_shard_task(task):
+    return run_shard(*task)
+
+
+class ParallelSimulation:
+    """Shards simulations across a process pool.
+
+    Work is split into fixed-size shards of (strategy, shard seed, spin range).
+    Shard boundaries and seeds derive from `master_seed` and `shard_size` only,
+    so results are identical whatever the number of workers.
+    """
+
+    def __init__(self, master_seed=0, shard_size=DEFAULT_SHARD_SIZE, max_workers=None, wheel=None):
+        self.master_seed = master_seed
+        self.wheel = wheel
+        self.shard_size = shard_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def _shards(self, num_spins):
+        return [(index, min(self.shard_size, num_spins - start))
+                for index, start in enumerate(range(0, num_spins, self.shard_size))]
+
+    def run_simulations(self, runs, num_spins):
+        """Runs every (strategy_type, config) in `runs` over `num_spins` spins.
+        Returns a list of merged result dicts, in the order of `runs`.
+        """
+        shards = self._shards(num_spins)
+        tasks = [(strategy_type, config, self.master_seed, index, size, DEFAULT_CHUNK_SIZE, self.wheel)
+                 for strategy_type, config in runs
+                 for index, size in shards]
+
+        if self.max_workers == 1:
+            shard_stats = [_run_shard_task(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                shard_stats = list(executor.map(_run_shard_task, tasks, chunksize=max(1, len(tasks) // (self.max_workers * 4))))
+
+        results = []
+        for i, (strategy_type, config) in enumerate(runs):
+            merged = SimulationStats()
+            for stats in shard_stats[i * len(shards):(i + 1) * len(shards)]:
+                merged = merged.merge(stats)
+            result = merged.to_dict()
+            result.update({"strategy_type": strategy_type, "config": config, "master_seed": self.master_seed})
+            results.append(result)
+        return results
+
+    def run_simulation(self, strategy_type, config, num_spins=1000):
+        """Runs a simulation for a given strategy over a specified number of spins."""
+        return self.run_simulations([(strategy_type, config)], num_spins)[0]
+
+    def compare_strategies(self, num_spins=1000):
+        """Compares all three strategies over the same spins (paired comparison)."""
+        strategies = [
+            {"type": "terminal_8", "name": "Terminal 8 (1→6)"},
+            {"type": "3x3_pattern", "name": "Padrão 3x3"},
+            {"type": "2x7_pattern", "name": "Padrão 2x7"}
+        ]
+
+        config = {"chip_value": 1.0, "max_entries": 2}
+        results = self.run_simulations([(strategy["type"], config) for strategy in strategies], num_spins)
+        for strategy, result in zip(strategies, results):
+            result["strategy_name"] = strategy["name"]
+        return results
+
+# Example Usage (for testing)
+if __name__ == "__main__":
+    import time
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        simulation = ParallelSimulation(master_seed=2024, max_workers=workers)
+        start = time.perf_counter()
+        results = simulation.compare_strategies(20_000_000)
+        elapsed = time.perf_counter() - start
+        print(f"{workers} worker(s): {elapsed:.2f}s")
+        for result in results:
+            print(f"  {result['strategy_name']}: profit {result['total_profit']:.2f}, "
+                  f"bets {result['total_bets']}, max drawdown {result['max_drawdown']:.2f}")
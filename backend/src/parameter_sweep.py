@@ -0,0 +1,195 @@
+import hashlib
+import itertools
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+import numpy as np
+from src.strategies.strategy_logic import compile_strategy
+from src.vectorized_simulation import DEFAULT_CHUNK_SIZE, SimulationStats, entry_mask, generate_spins, settle_bets
+
+# Trigger indices kept per process, keyed by (spin stream digest, trigger key)
+TRIGGER_INDEX_CACHE_SIZE = 64
+
+# Metrics where lower is better when ranking
+ASCENDING_METRICS = {"max_drawdown", "longest_losing_streak", "std_profit_per_trigger"}
+
+_trigger_index_cache = OrderedDict()
+_trigger_index_lock = Lock()
+
+
+def stream_digest(spins):
+    """Identifies a spin stream by its contents."""
+    return hashlib.blake2b(np.ascontiguousarray(spins).tobytes(), digest_size=16).hexdigest()
+
+
+def trigger_index(strategy, spins, digest=None):
+    """Boolean array, True on the first spin after each trigger of `strategy`.
+
+    Trigger positions depend only on the trigger and the spins, not on the
+    stakes or entries, so the index is cached per (stream, trigger key) and
+    shared by every config of a sweep.
+    """
+    key = (digest or stream_digest(spins), strategy.trigger_key)
+    with _trigger_index_lock:
+        starts = _trigger_index_cache.get(key)
+        if starts is not None:
+            _trigger_index_cache.move_to_end(key)
+            return starts
+
+    fired = strategy.create_trigger().scan(spins)
+    # Bets generated by a trigger are placed on the following spin
+    starts = np.concatenate(([False], fired[:-1])) if len(fired) else fired
+    with _trigger_index_lock:
+        _trigger_index_cache[key] = starts
+        if len(_trigger_index_cache) > TRIGGER_INDEX_CACHE_SIZE:
+            _trigger_index_cache.popitem(last=False)
+    return starts
+
+
+def expand_grid(grid, base_config=None):
+    """Every combination of the values in `grid` ({key: [values]}) on top of `base_config`."""
+    keys = list(grid)
+    return [dict(base_config or {}, **dict(zip(keys, values)))
+            for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def evaluate_unit_configs(strategy_type, configs, spins, digest=None):
+    """Settles each config at a chip value of 1 on `spins`.
+    Configs should share a trigger; its index is computed once.
+    Returns a list of SimulationStats, in the order of `configs`.
+    """
+    digest = digest or stream_digest(spins)
+    results = []
+    for config in configs:
+        strategy = compile_strategy(strategy_type, config)
+        template = strategy.template
+        stakes = np.append(template.stakes, 0.0)  # 00 simply loses
+        betting = trigger_index(strategy, spins, digest)
+        if strategy.max_entries > 1:
+            betting, _, _ = entry_mask(betting, stakes[spins] > 0, strategy.max_entries)
+        _, profits = settle_bets(betting, spins, stakes, template.total_stake)
+
+        stats = SimulationStats()
+        stats.spins = len(spins)
+        stats.add(profits, len(template.bets), template.total_stake)
+        results.append(stats)
+    return results
+
+
+def _evaluate_task(task):
+    return evaluate_unit_configs(*task)
+
+
+class ParameterSweep:
+    """Grid search over strategy configs on one shared spin stream.
+
+    Configs are grouped so the work grows with the distinct triggers and
+    entry rules, not with the grid size:
+    - trigger positions are computed once per trigger (see trigger_index);
+    - each (trigger, bets, max_entries) is settled once at a chip value of 1,
+      and every chip value reuses it, since profits scale with the stake.
+    Groups sharing a trigger run in the same task, across a process pool.
+    """
+
+    def __init__(self, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=1, wheel=None):
+        self.rng = np.random.default_rng(seed)
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.wheel = wheel
+
+    def _draw_spins(self, num_spins):
+        chunks = [generate_spins(self.rng, min(self.chunk_size, num_spins - start), self.wheel)
+                  for start in range(0, num_spins, self.chunk_size)]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int8)
+
+    def run_sweep(self, strategy_type, grid, base_config=None, num_spins=1000, spins=None,
+                  rank_by="total_profit", bankroll=None, top=None):
+        """Evaluates every combination of `grid` for a strategy and ranks the results.
+        grid: {config key: [values]}, e.g. {"chip_value": [0.5, 1], "max_entries": [1, 2, 3]}
+              ("numbers" replaces the list of the list strategies)
+        spins: optional array of outcomes to replay instead of drawing new ones
+        rank_by: result metric to sort by (lower first for drawdown/streak/std)
+        bankroll: optional bankroll used to flag configs that would have been ruined
+        top: optional number of ranked results to return
+        """
+        configs = expand_grid(grid, base_config)
+        if spins is None:
+            spins = self._draw_spins(num_spins)
+        spins = np.asarray(spins, dtype=np.int8)
+        digest = stream_digest(spins)
+
+        # (trigger key, bets, max_entries) -> index of its unit config; unit configs grouped by trigger
+        group_of = []
+        unit_index = {}
+        tasks = {}
+        for config in configs:
+            strategy = compile_strategy(strategy_type, config)
+            if strategy is None:
+                raise ValueError(f"Unknown strategy type: {strategy_type}")
+            key = (strategy.trigger_key, strategy.chips, strategy.max_entries)
+            if key not in unit_index:
+                unit_configs = tasks.setdefault(strategy.trigger_key, [])
+                unit_index[key] = (strategy.trigger_key, len(unit_configs))
+                unit_configs.append(dict(config, chip_value=1.0))
+            group_of.append((unit_index[key], strategy.chip_value))
+
+        task_list = [(strategy_type, unit_configs, spins, digest) for unit_configs in tasks.values()]
+        if self.max_workers == 1 or len(task_list) == 1:
+            task_stats = [_evaluate_task(task) for task in task_list]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(task_list))) as executor:
+                task_stats = list(executor.map(_evaluate_task, task_list))
+        unit_stats = dict(zip(tasks, task_stats))
+
+        results = []
+        for config, ((trigger_key, position), chip_value) in zip(configs, group_of):
+            stats = unit_stats[trigger_key][position].scaled(chip_value)
+            result = stats.to_dict()
+            result.update({
+                "config": config,
+                "lowest_profit": stats.trough,
+                "profit_to_drawdown": stats.profit / stats.max_drawdown if stats.max_drawdown else None
+            })
+            if bankroll is not None:
+                result["ruined"] = stats.trough <= -bankroll
+            results.append(result)
+
+        ascending = rank_by in ASCENDING_METRICS
+        results.sort(key=lambda result: (result.get(rank_by) is None,
+                                         (result.get(rank_by) or 0) * (1 if ascending else -1)))
+        for rank, result in enumerate(results, start=1):
+            result["rank"] = rank
+
+        return {
+            "strategy_type": strategy_type,
+            "num_spins": len(spins),
+            "configs_evaluated": len(configs),
+            "settlements": len(unit_index),
+            "trigger_indices": len(tasks),
+            "rank_by": rank_by,
+            "results": results[:top] if top else results
+        }
+
+# Example Usage (for testing)
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    number_lists = [sorted(rng.choice(37, size=11, replace=False).tolist()) for _ in range(20)]
+    grid = {
+        "chip_value": [0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 7.5, 10.0],
+        "max_entries": [1, 2, 3, 4, 5],
+        "numbers": number_lists
+    }
+
+    sweep = ParameterSweep(seed=42, max_workers=os.cpu_count())
+    start = time.perf_counter()
+    result = sweep.run_sweep("3x3_pattern", grid, num_spins=1_000_000, rank_by="profit_to_drawdown", bankroll=500)
+    elapsed = time.perf_counter() - start
+    print(f"{result['configs_evaluated']} configs ({result['settlements']} settlements, "
+          f"{result['trigger_indices']} trigger indices) over {result['num_spins']:,} spins in {elapsed:.2f}s")
+    for row in result["results"][:5]:
+        print(f"  #{row['rank']}: chip {row['config']['chip_value']}, entries {row['config']['max_entries']}, "
+              f"numbers {row['config']['numbers']}: profit {row['total_profit']:.2f}, "
+              f"max drawdown {row['max_drawdown']:.2f}, longest losing streak {row['longest_losing_streak']}")
@@ -0,0 +1,181 @@
+import numpy as np
+from src.strategies.strategy_logic import compile_strategy
+from src.vectorized_simulation import DEFAULT_CHUNK_SIZE, ChunkSettler, generate_spins
+
+
+class _PathStats:
+    """Running P&L path of one bankroll: total, peak, max drawdown and ruin."""
+
+    def __init__(self, bankroll=None):
+        self.bankroll = bankroll
+        self.profit = 0.0
+        self.peak = 0.0
+        self.trough = 0.0
+        self.max_drawdown = 0.0
+        self.ruined_at_spin = None
+
+    def add(self, spin_profits, offset):
+        if not spin_profits.any():
+            return
+        cumulative = self.profit + np.cumsum(spin_profits)
+        running_peak = np.maximum(np.maximum.accumulate(cumulative), self.peak)
+        self.max_drawdown = max(self.max_drawdown, float(np.max(running_peak - cumulative)))
+        self.peak = float(running_peak[-1])
+        self.trough = min(self.trough, float(np.min(cumulative)))
+        if self.bankroll is not None and self.ruined_at_spin is None:
+            ruined = np.flatnonzero(cumulative <= -self.bankroll)
+            if len(ruined):
+                self.ruined_at_spin = offset + int(ruined[0]) + 1
+        self.profit = float(cumulative[-1])
+
+    def to_dict(self):
+        result = {
+            "total_profit": self.profit,
+            "peak_profit": self.peak,
+            "lowest_profit": self.trough,
+            "max_drawdown": self.max_drawdown
+        }
+        if self.bankroll is not None:
+            result["bankroll"] = self.bankroll
+            result["ruined"] = self.ruined_at_spin is not None
+            result["ruined_at_spin"] = self.ruined_at_spin
+        return result
+
+
+class PortfolioSimulation:
+    """Runs several strategies over one shared spin stream (common random numbers).
+
+    The stream is drawn once per chunk and fed to every strategy, so
+    differences between strategies are not hidden by independent noise, and
+    combinations of strategies can be evaluated on a single bankroll.
+    """
+
+    def __init__(self, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, wheel=None):
+        self.rng = np.random.default_rng(seed)
+        self.chunk_size = chunk_size
+        self.wheel = wheel
+
+    def run_portfolio(self, strategies, num_spins=1000, combinations=None, bankroll=None, spins=None):
+        """Simulates `strategies` on the same spins.
+        strategies: list of (strategy_type, config) or dicts with "type"/"config"/"name"
+        combinations: list of index lists run together on one bankroll (default: all together)
+        bankroll: optional starting bankroll used to flag ruin
+        spins: optional array of outcomes to replay instead of drawing new ones
+        """
+        entries = []
+        for item in strategies:
+            if isinstance(item, dict):
+                strategy_type, config = item["type"], item.get("config", {})
+                name = item.get("name", strategy_type)
+            else:
+                strategy_type, config = item
+                name = strategy_type
+            strategy = compile_strategy(strategy_type, config)
+            if strategy is None:
+                raise ValueError(f"Unknown strategy type: {strategy_type}")
+            entries.append({"name": name, "strategy_type": strategy_type, "config": config, "strategy": strategy})
+
+        count = len(entries)
+        if combinations is None:
+            combinations = [list(range(count))]
+
+        settlers = [ChunkSettler(entry["strategy"]) for entry in entries]
+        paths = [_PathStats(bankroll) for _ in entries]
+        combination_paths = [_PathStats(bankroll) for _ in combinations]
+        trigger_counts = np.zeros(count, dtype=np.int64)
+        winning_counts = np.zeros(count, dtype=np.int64)
+        overlap = np.zeros((count, count), dtype=np.int64)
+        profit_sum = np.zeros(count)
+        profit_products = np.zeros((count, count))
+
+        if spins is not None:
+            spins = np.asarray(spins, dtype=np.int8)
+            num_spins = len(spins)
+        offset = 0
+        while offset < num_spins:
+            size = min(self.chunk_size, num_spins - offset)
+            chunk = spins[offset:offset + size] if spins is not None else generate_spins(self.rng, size, self.wheel)
+
+            # Per-spin profit of every strategy on this chunk (0 where it did not bet)
+            spin_profits = np.zeros((size, count))
+            betting = np.zeros((size, count), dtype=bool)
+            for i, settler in enumerate(settlers):
+                positions, profits = settler.settle(chunk)
+                spin_profits[positions, i] = profits
+                betting[positions, i] = True
+                trigger_counts[i] += len(positions)
+                winning_counts[i] += int(np.count_nonzero(profits > -settler.template.total_stake))
+                paths[i].add(spin_profits[:, i], offset)
+
+            for path, members in zip(combination_paths, combinations):
+                path.add(spin_profits[:, members].sum(axis=1), offset)
+
+            as_int = betting.astype(np.int64)
+            overlap += as_int.T @ as_int
+            profit_sum += spin_profits.sum(axis=0)
+            profit_products += spin_profits.T @ spin_profits
+            offset += size
+
+        # Pearson correlation of the per-spin profit series
+        mean = profit_sum / num_spins if num_spins else profit_sum
+        covariance = profit_products / num_spins - np.outer(mean, mean) if num_spins else profit_products
+        std = np.sqrt(np.clip(np.diag(covariance), 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = covariance / np.outer(std, std)
+        correlation = np.where(np.isfinite(correlation), correlation, 0.0)
+
+        per_strategy = []
+        for i, entry in enumerate(entries):
+            template = entry["strategy"].template
+            total_bets = int(trigger_counts[i]) * len(template.bets)
+            result = paths[i].to_dict()
+            result.update({
+                "name": entry["name"],
+                "strategy_type": entry["strategy_type"],
+                "config": entry["config"],
+                "triggers": int(trigger_counts[i]),
+                "total_bets": total_bets,
+                "winning_bets": int(winning_counts[i]),
+                "win_rate": (int(winning_counts[i]) / total_bets * 100) if total_bets > 0 else 0,
+                "avg_profit_per_bet": paths[i].profit / total_bets if total_bets > 0 else 0
+            })
+            per_strategy.append(result)
+
+        combined = []
+        for path, members in zip(combination_paths, combinations):
+            result = path.to_dict()
+            result["strategies"] = [entries[i]["name"] for i in members]
+            combined.append(result)
+
+        return {
+            "num_spins": num_spins,
+            "strategies": per_strategy,
+            "combinations": combined,
+            # overlap_spins[i][j]: spins on which strategies i and j both had bets
+            "overlap_spins": overlap.tolist(),
+            # shared_numbers[i][j]: numbers covered by the bet sets of both strategies
+            "shared_numbers": [
+                [list(a["strategy"].template.coverage & b["strategy"].template.coverage) for b in entries]
+                for a in entries
+            ],
+            "correlation": correlation.tolist()
+        }
+
+# Example Usage (for testing)
+if __name__ == "__main__":
+    simulation = PortfolioSimulation(seed=7)
+    config = {"chip_value": 1.0, "max_entries": 2}
+    result = simulation.run_portfolio(
+        [("terminal_8", config), ("3x3_pattern", config), ("2x7_pattern", config)],
+        num_spins=5_000_000,
+        combinations=[[0, 1], [1, 2], [0, 1, 2]],
+        bankroll=500
+    )
+
+    for strategy in result["strategies"]:
+        print(f"{strategy['name']}: profit {strategy['total_profit']:.2f}, max drawdown {strategy['max_drawdown']:.2f}")
+    for combination in result["combinations"]:
+        print(f"{' + '.join(combination['strategies'])}: profit {combination['total_profit']:.2f}, "
+              f"ruined at spin {combination['ruined_at_spin']}")
+    print(f"Overlap (spins): {result['overlap_spins']}")
+    print(f"Correlation: {result['correlation']}")
@@ -0,0 +1,118 @@
+import os
+import sys
+import time
+from datetime import datetime, date, timedelta
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable, CreateIndex
+from src.models.bet import Bet, bets_query
+from src.models.profit_report import (
+    ProfitReport, rebuild_profit_reports, strategy_totals_query, daily_totals_query, user_totals_query
+)
+
+bet = Bet.__table__
+
+
+def hot_queries(user_id, start, end, strategy_id):
+    """The statements behind /bets, /bets/stats and /reports/*, by name, built by the
+    same helpers the routes use (the reports read the daily ProfitReport rollups)."""
+    page = 100 + 1  # A page plus the row telling whether there is a next one
+    cursor = (datetime.combine(end, datetime.min.time()), 0)
+    return {
+        "bets": bets_query(user_id).limit(page),
+        "bets_next_page": bets_query(user_id, after=cursor).limit(page),
+        "bets_by_strategy": bets_query(user_id, strategy_id).limit(page),
+        "bets_by_strategy_next_page": bets_query(user_id, strategy_id, after=cursor).limit(page),
+        "bets_in_period": bets_query(user_id, start=start, end=end).limit(page),
+        "bet_stats": user_totals_query(user_id, start),
+        "strategy_totals": strategy_totals_query(user_id, start, end),
+        "daily_profit": daily_totals_query(user_id, start, end),
+    }
+
+
+def explain(connection, statement):
+    """Returns the plan lines of a statement (SQLite or PostgreSQL)."""
+    compiled = statement.compile(connection, compile_kwargs={"literal_binds": True})
+    if connection.dialect.name == "sqlite":
+        return [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+    return [row[0] for row in connection.execute(text(f"EXPLAIN {compiled}"))]
+
+
+def uses_index(plan):
+    """True if no step scans a whole table (or a whole index of it)."""
+    for line in plan:
+        # SQLite: "SCAN bet [USING ... INDEX]"; PostgreSQL: "Seq Scan on bet"
+        if line.startswith("SCAN ") or "Seq Scan on " in line:
+            return False
+    return True
+
+
+def populate(connection, user_count, bets_per_user, days=180):
+    """Inserts synthetic bets spread over the last `days` days."""
+    import numpy as np
+    rng = np.random.default_rng(1)
+    now = datetime.utcnow()
+    batch = 100_000
+    for user_id in range(1, user_count + 1):
+        for first in range(0, bets_per_user, batch):
+            size = min(batch, bets_per_user - first)
+            seconds = rng.integers(0, days * 86400, size)
+            won = rng.random(size) < 1 / 37
+            connection.execute(bet.insert(), [
+                {
+                    "user_id": user_id,
+                    "strategy_id": int(strategy_id),
+                    "betting_house": "betfair",
+                    "roulette_type": "evolution",
+                    "bet_time": now - timedelta(seconds=int(second)),
+                    "bet_amount": 1.0,
+                    "bet_numbers": "[17]",
+                    "outcome_number": 17,
+                    "profit_loss": 35.0 if win else -1.0,
+                    "status": "won" if win else "lost"
+                }
+                for strategy_id, second, win in zip(rng.integers(1, 6, size), seconds, won)
+            ])
+
+
+# Checks that every hot Bet query is served by an index at realistic volume.
+# Usage: python -m src.query_plans [bets per user] [database url]
+if __name__ == "__main__":
+    bets_per_user = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    url = sys.argv[2] if len(sys.argv) > 2 else "sqlite:////tmp/query_plans.db"
+    if url.startswith("sqlite:///") and os.path.exists(url[len("sqlite:///"):]):
+        os.remove(url[len("sqlite:///"):])
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        # Foreign keys left out: the user and strategy tables are not needed here
+        for table in (bet, ProfitReport.__table__):
+            connection.execute(CreateTable(table, include_foreign_key_constraints=[]))
+            for index in table.indexes:
+                connection.execute(CreateIndex(index))
+        start = time.perf_counter()
+        populate(connection, user_count=2, bets_per_user=bets_per_user)
+        print(f"Inserted {2 * bets_per_user:,} bets in {time.perf_counter() - start:.1f}s")
+    with Session(engine) as session:
+        rows = rebuild_profit_reports(session)
+        session.commit()
+        print(f"Built {rows:,} daily rollup rows")
+    with engine.begin() as connection:
+        if connection.dialect.name == "sqlite":
+            connection.execute(text("ANALYZE"))
+
+    today = date.today()
+    queries = hot_queries(1, today - timedelta(days=30), today, 3)
+    failures = 0
+    with engine.connect() as connection:
+        for name, statement in queries.items():
+            plan = explain(connection, statement)
+            start = time.perf_counter()
+            connection.execute(statement).fetchall()
+            elapsed = (time.perf_counter() - start) * 1000
+            ok = uses_index(plan)
+            failures += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {name} ({elapsed:.1f} ms)")
+            for line in plan:
+                print(f"       {line}")
+    sys.exit(1 if failures else 0)
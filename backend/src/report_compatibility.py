@@ -0,0 +1,176 @@
+import math
+import os
+import sys
+from datetime import datetime, date, timedelta
+
+DEFAULT_URL = "sqlite:////tmp/report_compatibility.db"
+
+
+def legacy_profit_report(bets, period, start_date, end_date):
+    """/reports/profit as it was computed before the rollups: a Python pass over every bet."""
+    total_profit = sum(bet.profit_loss for bet in bets)
+    total_bets = len(bets)
+    winning_bets = len([bet for bet in bets if bet.profit_loss > 0])
+    losing_bets = len([bet for bet in bets if bet.profit_loss < 0])
+    win_rate = (winning_bets / total_bets * 100) if total_bets > 0 else 0
+
+    strategy_stats = {}
+    for bet in bets:
+        strategy_id = bet.strategy_id
+        if strategy_id not in strategy_stats:
+            strategy_stats[strategy_id] = {
+                'strategy_id': strategy_id,
+                'total_bets': 0,
+                'total_profit': 0,
+                'winning_bets': 0,
+                'losing_bets': 0
+            }
+        strategy_stats[strategy_id]['total_bets'] += 1
+        strategy_stats[strategy_id]['total_profit'] += bet.profit_loss
+        if bet.profit_loss > 0:
+            strategy_stats[strategy_id]['winning_bets'] += 1
+        elif bet.profit_loss < 0:
+            strategy_stats[strategy_id]['losing_bets'] += 1
+
+    for stats in strategy_stats.values():
+        stats['win_rate'] = (stats['winning_bets'] / stats['total_bets'] * 100) if stats['total_bets'] > 0 else 0
+
+    return {
+        'period': period,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'total_profit': total_profit,
+        'total_bets': total_bets,
+        'winning_bets': winning_bets,
+        'losing_bets': losing_bets,
+        'win_rate': win_rate,
+        'strategy_breakdown': list(strategy_stats.values())
+    }
+
+
+def legacy_bet_stats(bets, period):
+    """/bets/stats as it was computed before the rollups."""
+    total_bets = len(bets)
+    winning_bets = len([bet for bet in bets if bet.profit_loss > 0])
+    return {
+        'period': period,
+        'total_bets': total_bets,
+        'total_profit': sum(bet.profit_loss for bet in bets),
+        'winning_bets': winning_bets,
+        'losing_bets': len([bet for bet in bets if bet.profit_loss < 0]),
+        'win_rate': (winning_bets / total_bets * 100) if total_bets > 0 else 0
+    }
+
+
+def same(old, new, path="$"):
+    """Lists the differences between two JSON values; floats compared with a tolerance."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        if old.keys() != new.keys():
+            return [f"{path}: keys {sorted(old)} != {sorted(new)}"]
+        return [diff for key in old for diff in same(old[key], new[key], f"{path}.{key}")]
+    if isinstance(old, list) and isinstance(new, list):
+        if len(old) != len(new):
+            return [f"{path}: {len(old)} items != {len(new)}"]
+        return [diff for i, (a, b) in enumerate(zip(old, new)) for diff in same(a, b, f"{path}[{i}]")]
+    if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+        return [] if math.isclose(old, new, rel_tol=1e-9, abs_tol=1e-9) else [f"{path}: {old} != {new}"]
+    return [] if old == new else [f"{path}: {old!r} != {new!r}"]
+
+
+def seed(client, connection_bets, num_bets, days, rng):
+    """Creates a user with three strategies and `num_bets` bets spread over `days` days.
+    Three quarters are settled through /automation/update_bet_outcome, a few of
+    those are corrected through PUT /bets/<id>, the rest stay pending.
+    """
+    user = client.post('/api/users', json={
+        'username': 'report_check', 'email': 'report_check@example.com', 'password': 'Secret123'
+    }).get_json()['user']
+    strategy_ids = [client.post('/api/strategies', json={
+        'user_id': user['id'], 'name': f'Strategy {i}', 'strategy_type': '3x3_pattern', 'config': {}
+    }).get_json()['id'] for i in range(3)]
+
+    now = datetime.utcnow()
+    bet_ids = connection_bets([{
+        'user_id': user['id'],
+        'strategy_id': int(rng.choice(strategy_ids)),
+        'betting_house': 'betfair',
+        'roulette_type': 'evolution',
+        'bet_time': now - timedelta(seconds=int(rng.integers(0, days * 86400))),
+        'bet_amount': float(rng.choice([0.5, 1.0, 2.0])),
+        'bet_numbers': f'[{int(rng.integers(0, 37))}]',
+        'status': 'pending'
+    } for _ in range(num_bets)])
+
+    for bet_id in rng.permutation(bet_ids)[:num_bets * 3 // 4]:
+        response = client.post('/api/automation/update_bet_outcome', json={
+            'bet_id': int(bet_id), 'outcome_number': int(rng.integers(0, 37))
+        })
+        assert response.status_code == 200, response.get_json()
+    for bet_id in rng.permutation(bet_ids)[:num_bets // 20]:
+        status = str(rng.choice(['won', 'lost', 'pending']))
+        response = client.put(f'/api/bets/{int(bet_id)}', json={
+            'status': status, 'profit_loss': {'won': 70.0, 'lost': -2.0, 'pending': 0.0}[status]
+        })
+        assert response.status_code == 200, response.get_json()
+    return user['id']
+
+
+# Compares /reports/profit and /bets/stats (SQL aggregates over the daily rollups)
+# with the old Python computation over every bet, on a seeded dataset.
+# The old code also counted pending bets and cut the last day of a period at
+# midnight; both are fixed, so the old computation is given the settled bets
+# of the whole period.
+# Usage: python -m src.report_compatibility [bets] [database url]
+if __name__ == "__main__":
+    import numpy as np
+
+    num_bets = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    url = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_URL
+    if url.startswith("sqlite:///") and os.path.exists(url[len("sqlite:///"):]):
+        os.remove(url[len("sqlite:///"):])
+    os.environ["DATABASE_URL"] = url
+
+    from src.main import app
+    from src.models.user import db
+    from src.models.bet import Bet
+    from src.models.profit_report import SETTLED_STATUSES
+
+    def insert_bets(rows):
+        with app.app_context():
+            bets = [Bet(**row) for row in rows]
+            db.session.add_all(bets)
+            db.session.commit()
+            return [bet.id for bet in bets]
+
+    client = app.test_client()
+    user_id = seed(client, insert_bets, num_bets, days=60, rng=np.random.default_rng(7))
+
+    with app.app_context():
+        settled = Bet.query.filter(Bet.user_id == user_id, Bet.status.in_(SETTLED_STATUSES)).all()
+        today = date.today()
+        checks = []
+        for period in ('day', 'week', 'month'):
+            new = client.get(f'/api/reports/profit?user_id={user_id}&period={period}').get_json()
+            start_date = date.fromisoformat(new['start_date'])
+            end_date = date.fromisoformat(new['end_date'])
+            in_period = [bet for bet in settled if start_date <= bet.bet_time.date() <= end_date]
+            old = legacy_profit_report(in_period, period, start_date, end_date)
+            # Breakdown order is not part of the contract
+            for report in (old, new):
+                report['strategy_breakdown'].sort(key=lambda stats: stats['strategy_id'])
+            checks.append((f'/reports/profit?period={period}', old, new))
+
+        cutoffs = {'day': today, 'week': today - timedelta(days=7), 'month': today - timedelta(days=30), 'all': None}
+        for period, cutoff in cutoffs.items():
+            new = client.get(f'/api/bets/stats?user_id={user_id}&period={period}').get_json()
+            in_period = [bet for bet in settled if cutoff is None or bet.bet_time.date() >= cutoff]
+            checks.append((f'/bets/stats?period={period}', legacy_bet_stats(in_period, period), new))
+
+    failures = 0
+    for name, old, new in checks:
+        differences = same(old, new)
+        failures += bool(differences)
+        print(f"{'OK  ' if not differences else 'FAIL'} {name} ({new.get('total_bets')} bets)")
+        for difference in differences:
+            print(f"       {difference}")
+    sys.exit(1 if failures else 0)
@@ -1,14 +1,93 @@
 import random
+import numpy as np
+
+# Pocket index used for "00" on American wheels
+DOUBLE_ZERO = 37
+
+
+class WheelModel:
+    """Outcome distribution of a roulette wheel.
+    numbers: pocket numbers (00 is encoded as DOUBLE_ZERO)
+    weights: optional relative weight per pocket (uniform by default)
+    """
+
+    def __init__(self, name, numbers, weights=None):
+        self.name = name
+        self.numbers = np.asarray(list(numbers), dtype=np.int8)
+        if weights is None:
+            self.probabilities = None
+        else:
+            weights = np.asarray(weights, dtype=float)
+            if weights.shape != self.numbers.shape or (weights < 0).any() or weights.sum() <= 0:
+                raise ValueError("weights must hold one non-negative weight per pocket")
+            self.probabilities = weights / weights.sum()
+        # Pockets 0..n-1 drawn uniformly can use the fast integer path
+        self._contiguous = self.probabilities is None and np.array_equal(self.numbers, np.arange(len(self.numbers)))
+
+    @property
+    def size(self):
+        """Number of distinct pocket indices (columns of a bet matrix)."""
+        return int(self.numbers.max()) + 1
+
+    def sample(self, rng, size):
+        """Draws `size` outcomes at once as an int8 array."""
+        if self._contiguous:
+            return rng.integers(0, len(self.numbers), size=size, dtype=np.int8)
+        return rng.choice(self.numbers, size=size, p=self.probabilities)
+
+    def pocket_probabilities(self):
+        """Probability of each pocket index 0..size-1."""
+        probabilities = np.zeros(self.size)
+        weights = self.probabilities if self.probabilities is not None else np.full(len(self.numbers), 1 / len(self.numbers))
+        np.add.at(probabilities, self.numbers, weights)
+        return probabilities
+
+    def __repr__(self):
+        return f"<WheelModel {self.name}>"
+
+
+EUROPEAN_WHEEL = WheelModel("european", range(37))                       # 0-36
+AMERICAN_WHEEL = WheelModel("american", list(range(37)) + [DOUBLE_ZERO])  # 0-36 + 00
+
+
+def biased_wheel(weights, base=EUROPEAN_WHEEL):
+    """Wheel with the pockets of `base` drawn with custom relative weights.
+    weights: list with one weight per pocket of `base`, or dict {number: weight}
+    (missing numbers keep weight 1)
+    """
+    if isinstance(weights, dict):
+        weights = [weights.get(int(number), 1.0) for number in base.numbers]
+    return WheelModel(f"biased_{base.name}", base.numbers, weights)
+
+
+WHEEL_MODELS = {
+    "european": EUROPEAN_WHEEL,
+    "american": AMERICAN_WHEEL
+}
+
 
 class RouletteSimulator:
-    def __init__(self, numbers=None):
+    def __init__(self, numbers=None, wheel=None, seed=None):
         # Standard European Roulette numbers
-        self.numbers = numbers if numbers is not None else list(range(37)) # 0-36
+        if wheel is None:
+            wheel = WheelModel("custom", numbers) if numbers is not None else EUROPEAN_WHEEL
+        self.wheel = wheel
+        self.numbers = [int(number) for number in wheel.numbers]
+        self._weights = list(wheel.probabilities) if wheel.probabilities is not None else None
+        self.rng = np.random.default_rng(seed)
 
     def spin(self):
         """Simulates a spin of the roulette wheel and returns the winning number."""
+        if self._weights is not None:
+            return random.choices(self.numbers, self._weights)[0]
         return random.choice(self.numbers)
 
+    def spin_batch(self, n):
+        """Simulates `n` spins at once with the seedable numpy generator.
+        Returns an int8 array of winning numbers.
+        """
+        return self.wheel.sample(self.rng, n)
+
     def calculate_payout(self, bet_number, bet_amount, winning_number):
         """Calculates the payout for a single number bet.
         This is a simplified payout for a straight-up bet (35:1).
@@ -18,6 +97,28 @@ class RouletteSimulator:
         else:
             return -bet_amount # Lose the bet amount
 
+    def calculate_payouts(self, bet_matrix, outcomes):
+        """Vectorized calculate_payout for straight-up bet sets.
+        bet_matrix: stakes per pocket, shape (pockets,) for one bet set or
+                    (bet_sets, pockets) for several
+        outcomes: array of winning numbers
+        Returns the profit of each bet set for each outcome, shape (len(outcomes),)
+        or (len(outcomes), bet_sets).
+        """
+        bet_matrix = np.asarray(bet_matrix, dtype=float)
+        outcomes = np.asarray(outcomes, dtype=np.intp)
+        single = bet_matrix.ndim == 1
+        if single:
+            bet_matrix = bet_matrix[None, :]
+        pockets = max(self.wheel.size, int(outcomes.max()) + 1 if len(outcomes) else 0)
+        if bet_matrix.shape[1] < pockets:
+            # Pockets without a column (e.g. 00) carry no stake
+            bet_matrix = np.pad(bet_matrix, ((0, 0), (0, pockets - bet_matrix.shape[1])))
+
+        stake_on_winner = bet_matrix[:, outcomes].T
+        profits = stake_on_winner * 36 - (bet_matrix.sum(axis=1) - stake_on_winner)
+        return profits[:, 0] if single else profits
+
 # Example Usage (for testing)
 if __name__ == "__main__":
     simulator = RouletteSimulator()
@@ -33,4 +134,10 @@ if __name__ == "__main__":
     payout = simulator.calculate_payout(bet_on, bet_amount, winning_num)
     print(f"\nBetting {bet_amount} on {bet_on}. Winning number: {winning_num}. Payout: {payout}")
 
-
+    # Batch spins and vectorized payouts on an American wheel
+    american = RouletteSimulator(wheel=AMERICAN_WHEEL, seed=1)
+    outcomes = american.spin_batch(1_000_000)
+    bets = np.zeros(37)
+    bets[17] = bet_amount
+    profits = american.calculate_payouts(bets, outcomes)
+    print(f"\n1,000,000 American spins betting {bet_amount} on {bet_on}: total {profits.sum():.2f}")
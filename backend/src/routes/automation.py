@@ -1,13 +1,72 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db, User
 from src.models.strategy import Strategy
-from src.models.bet import Bet
-from src.strategies.strategy_logic import StrategyLogic
+from src.models.bet import Bet, encode_bet_numbers
+from src.models.profit_report import settlement_snapshot, apply_settlement
+from src.settlement import settle_spin, pending_exposure
+from src.models.spin import Spin, parse_spin_number, parse_market_version
+from src.strategies.strategy_logic import StrategyLogic, get_compiled_strategy
+from src.strategies.table_fanout import TableSubscriptionIndex, TableHistory, evaluate_table_spin
 from datetime import datetime
+from sqlalchemy import insert
 import json
 
 automation_bp = Blueprint("automation", __name__)
 strategy_logic = StrategyLogic()
+subscription_index = TableSubscriptionIndex()
+table_history = TableHistory()
+
+def _save_bets(bets_to_place):
+    """Persists generated bets as pending records and returns the Bet objects.
+    All rows go in one bulk INSERT ... RETURNING, so the generated ids come
+    back without flushing one ORM object at a time. The rows are not sorted
+    back into parameter order: on SQLite that would fall back to one INSERT
+    per row, and every returned Bet carries its own strategy and number.
+    """
+    placed_bets_records = []
+    if bets_to_place:
+        rows = []
+        for bet_data in bets_to_place:
+            coverage_mask, stake_cents = encode_bet_numbers(bet_data["bet_numbers"], bet_data["bet_amount"])
+            rows.append({
+                "user_id": bet_data["user_id"],
+                "strategy_id": bet_data["strategy_id"],
+                "betting_house": bet_data["betting_house"],
+                "roulette_type": bet_data["roulette_type"],
+                "table_id": bet_data.get("table_id"),
+                "spin_id": bet_data.get("spin_id"),
+                "bet_amount": bet_data["bet_amount"],
+                "bet_numbers": bet_data["bet_numbers"],
+                "coverage_mask": coverage_mask,
+                "stake_cents": stake_cents,
+                "status": bet_data["status"]
+            })
+        placed_bets_records = db.session.scalars(
+            insert(Bet).returning(Bet), rows
+        ).all()
+        # Detached so the commit does not expire them (to_dict would reload each one)
+        for bet in placed_bets_records:
+            db.session.expunge(bet)
+    db.session.commit()
+    return placed_bets_records
+
+def _record_spin(winning_number, betting_house, roulette_type, user_id=None, table_id=None, market_version=None):
+    """Stores a received spin; committed together with the generated bets.
+    Spins with a user_id belong to that user's stream; table_id is kept on them for
+    reference only, and table streams read the spins received per table (no user_id).
+    Returns the Spin, flushed so its id can be stored on the bets it generates.
+    """
+    spin = Spin(
+        user_id=user_id,
+        betting_house=betting_house,
+        roulette_type=roulette_type,
+        table_id=str(table_id) if table_id is not None else None,
+        number=winning_number,
+        market_version=market_version
+    )
+    db.session.add(spin)
+    db.session.flush()
+    return spin
 
 @automation_bp.route("/automation/process_spin", methods=["POST"])
 def process_spin():
@@ -20,6 +79,11 @@ def process_spin():
 
     if not all([user_id, winning_number is not None, roulette_type, betting_house]):
         return jsonify({"error": "Missing required fields"}), 400
+    try:
+        winning_number = parse_spin_number(winning_number)
+        market_version = parse_market_version(data.get("market_version"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
         user = User.query.get(user_id)
@@ -30,31 +94,27 @@ def process_spin():
         from src.strategies.strategy_logic import get_active_strategies
         active_strategies = get_active_strategies(user_id)
 
-        # Get recent history for strategy evaluation (e.g., last 10 spins)
-        # This is a placeholder. In a real system, history would be managed more robustly.
-        # For now, let's assume we get history from the client or a dedicated service.
-        # For demonstration, we'll use a dummy history or fetch from recent bets.
-        recent_bets = Bet.query.filter_by(user_id=user_id).order_by(Bet.bet_time.desc()).limit(10).all()
-        history = [bet.outcome_number for bet in recent_bets if bet.outcome_number is not None]
-        history.insert(0, winning_number) # Add current winning number to history
+        # Recent history for strategy evaluation (most recent first), served from the
+        # in-memory ring buffer: every spin counts, not only those that produced a bet.
+        # Spins a user reports form the user's own stream, even when they name a table:
+        # several users reporting one table spin must not append it several times.
+        # The buffer only takes the spin once it is committed
+        table_id = data.get("table_id") or data.get("market_id")
+        history = table_history.preview(betting_house, None, winning_number, user_id=user_id)
+        spin = _record_spin(winning_number, betting_house, roulette_type, user_id=user_id, table_id=table_id,
+                            market_version=market_version)
 
         bets_to_place = []
 
         for strategy in active_strategies:
-            config = strategy.get_config()
+            # Compiled once per config change, not parsed again on every spin
+            compiled = get_compiled_strategy(strategy)
             
             # Check if the strategy is configured for the current betting house
-            if betting_house not in config.get("betting_houses", []):
+            if compiled is None or not compiled.accepts(betting_house):
                 continue
 
-            if strategy.strategy_type == "terminal_8":
-                strategy_bets = strategy_logic.execute_strategy_terminal_8(history, config)
-            elif strategy.strategy_type == "3x3_pattern":
-                strategy_bets = strategy_logic.execute_strategy_3x3_pattern(history, config)
-            elif strategy.strategy_type == "2x7_pattern":
-                strategy_bets = strategy_logic.execute_strategy_2x7_pattern(history, config)
-            else:
-                strategy_bets = []
+            strategy_bets = compiled.evaluate(history)
 
             if strategy_bets:
                 for bet_detail in strategy_bets:
@@ -63,6 +123,8 @@ def process_spin():
                         "strategy_id": strategy.id,
                         "betting_house": betting_house,
                         "roulette_type": roulette_type,
+                        "table_id": table_id,
+                        "spin_id": spin.id,
                         "bet_amount": bet_detail["amount"],
                         "bet_numbers": json.dumps([bet_detail["number"]]), # Assuming single number bets for now
                         "outcome_number": None, # Will be updated after actual bet placement
@@ -72,20 +134,8 @@ def process_spin():
         
         # Here, you would typically send these bets to the actual betting house API/automation.
         # For now, we'll just save them as pending in our DB.
-        placed_bets_records = []
-        for bet_data in bets_to_place:
-            new_bet = Bet(
-                user_id=bet_data["user_id"],
-                strategy_id=bet_data["strategy_id"],
-                betting_house=bet_data["betting_house"],
-                roulette_type=bet_data["roulette_type"],
-                bet_amount=bet_data["bet_amount"],
-                bet_numbers=bet_data["bet_numbers"],
-                status=bet_data["status"]
-            )
-            db.session.add(new_bet)
-            placed_bets_records.append(new_bet)
-        db.session.commit()
+        placed_bets_records = _save_bets(bets_to_place)
+        table_history.record(betting_house, None, winning_number, user_id=user_id)
 
         # After actual bet placement (simulated here), update status and profit/loss
         # This part would be handled by a separate process monitoring betting outcomes
@@ -93,6 +143,70 @@ def process_spin():
         return jsonify({
             "message": "Spin processed and bets generated (if any)",
             "winning_number": winning_number,
+            "spin_id": spin.id,
+            "bets_generated": [bet.to_dict() for bet in placed_bets_records]
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@automation_bp.route("/automation/process_table_spin", methods=["POST"])
+def process_table_spin():
+    """Receives a spin once per table and evaluates every subscribed user's strategies."""
+    data = request.get_json()
+    table_id = data.get("table_id") or data.get("market_id")
+    winning_number = data.get("winning_number")
+    roulette_type = data.get("roulette_type") # e.g., 'evolution', 'playtech'
+    betting_house = data.get("betting_house") # e.g., 'betfair', '1pra1bet', 'sportingbet'
+
+    if not all([table_id, winning_number is not None, roulette_type, betting_house]):
+        return jsonify({"error": "Missing required fields"}), 400
+    try:
+        winning_number = parse_spin_number(winning_number)
+        market_version = parse_market_version(data.get("market_version"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        # One history window per table, shared by every subscribed strategy; the buffer
+        # only takes the spin once it is committed
+        history = table_history.preview(betting_house, table_id, winning_number, market_version=market_version)
+        if history is None:
+            return jsonify({
+                "message": "Duplicate spin ignored",
+                "table_id": table_id,
+                "market_version": market_version
+            }), 200
+
+        spin = _record_spin(winning_number, betting_house, roulette_type, table_id=table_id, market_version=market_version)
+        subscription_index.refresh()
+        subscriptions = subscription_index.subscribers(betting_house, table_id)
+
+        bets_to_place = []
+        for subscription, strategy_bets in evaluate_table_spin(subscriptions, history):
+            for bet_detail in strategy_bets:
+                bets_to_place.append({
+                    "user_id": subscription.user_id,
+                    "strategy_id": subscription.strategy_id,
+                    "betting_house": betting_house,
+                    "roulette_type": roulette_type,
+                    "table_id": table_id,
+                    "spin_id": spin.id,
+                    "bet_amount": bet_detail["amount"],
+                    "bet_numbers": json.dumps([bet_detail["number"]]),
+                    "status": "pending_placement"
+                })
+
+        placed_bets_records = _save_bets(bets_to_place)
+        table_history.record(betting_house, table_id, winning_number, market_version=market_version)
+
+        return jsonify({
+            "message": "Table spin processed and bets generated (if any)",
+            "table_id": table_id,
+            "winning_number": winning_number,
+            "spin_id": spin.id,
+            "strategies_evaluated": len(subscriptions),
             "bets_generated": [bet.to_dict() for bet in placed_bets_records]
         }), 200
 
@@ -109,28 +223,26 @@ def update_bet_outcome():
 
     if not all([bet_id, outcome_number is not None]):
         return jsonify({"error": "Missing required fields"}), 400
+    try:
+        outcome_number = parse_spin_number(outcome_number)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
         bet = Bet.query.get(bet_id)
         if not bet:
             return jsonify({"error": "Bet not found"}), 404
 
+        settled_before = settlement_snapshot(bet)
         bet.outcome_number = outcome_number
         
-        # Calculate profit/loss (simplified for single number bets)
-        bet_numbers_list = json.loads(bet.bet_numbers)
-        profit_loss = -bet.bet_amount # Assume loss initially
-        
-        # For simplicity, if any of the bet numbers match the outcome, it's a win
-        # In a real system, this would be more complex based on bet types (e.g., splits, corners)
-        if outcome_number in bet_numbers_list:
-            # Assuming 35:1 payout for straight-up number bets
-            profit_loss = bet.bet_amount * 35 # Profit only, not including original stake
-            bet.status = "won"
-        else:
-            bet.status = "lost"
+        # Coverage and payout come from the bet's mask and stake (no JSON decoding)
+        profit_loss = bet.profit_on(outcome_number)
+        bet.status = "won" if bet.covers(outcome_number) else "lost"
         
         bet.profit_loss = profit_loss
+        # The daily rollup is updated in the same transaction as the bet
+        apply_settlement(db.session, settled_before, settlement_snapshot(bet))
         db.session.commit()
 
         return jsonify({"message": "Bet outcome updated", "bet": bet.to_dict()}), 200
@@ -139,4 +251,57 @@ def update_bet_outcome():
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
+@automation_bp.route("/automation/settle_spin", methods=["POST"])
+def settle_spin_outcome():
+    """Settles the pending bets of a table (or of a user without table) on a spin outcome.
+    The spin is identified by `spin_id` (from process_spin / process_table_spin) or
+    `market_version`; bets generated by that spin stay pending, so the call order
+    does not matter.
+    """
+    data = request.get_json()
+    table_id = data.get("table_id") or data.get("market_id")
+    user_id = data.get("user_id")
+    betting_house = data.get("betting_house")
+    outcome_number = data.get("outcome_number")
+    spin_id = data.get("spin_id")
+    market_version = data.get("market_version")
+
+    if not all([betting_house, outcome_number is not None, table_id or user_id]):
+        return jsonify({"error": "Missing required fields"}), 400
+    if spin_id is None and market_version is None:
+        return jsonify({"error": "spin_id or market_version is required"}), 400
+
+    try:
+        # Bets and daily rollups change in one transaction
+        summary = settle_spin(db.session, betting_house, outcome_number, table_id=table_id, user_id=user_id,
+                              spin_id=spin_id, market_version=market_version)
+        db.session.commit()
+        return jsonify(dict(summary, message="Spin settled", table_id=table_id)), 200
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@automation_bp.route("/automation/exposure", methods=["GET"])
+def get_exposure():
+    """Stake on each number across the pending bets of a table (or of a user without table)."""
+    table_id = request.args.get("table_id") or request.args.get("market_id")
+    user_id = request.args.get("user_id", type=int)
+    betting_house = request.args.get("betting_house")
+
+    if not all([betting_house, table_id or user_id]):
+        return jsonify({"error": "Missing required fields"}), 400
 
+    try:
+        exposure = pending_exposure(db.session, betting_house, table_id=table_id, user_id=user_id)
+        return jsonify({
+            "table_id": table_id,
+            "exposure": [{"number": number, "stake": stake} for number, stake in sorted(exposure.items())],
+            "total_stake": sum(exposure.values())
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
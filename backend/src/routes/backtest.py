@@ -0,0 +1,43 @@
+from flask import Blueprint, request, jsonify
+from src.models.strategy import Strategy
+from src.backtest import SpinStreamCache, run_backtest
+from datetime import datetime, timedelta
+
+backtest_bp = Blueprint('backtest', __name__)
+spin_streams = SpinStreamCache()
+
+@backtest_bp.route('/backtests', methods=['POST'])
+def create_backtest():
+    """Replay recorded spins of a user or table through a strategy"""
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    try:
+        if data.get('strategy_id'):
+            strategy = Strategy.query.get_or_404(data['strategy_id'])
+            strategy_type = strategy.strategy_type
+            config = data.get('config', strategy.get_config())
+        elif data.get('strategy_type'):
+            strategy_type = data['strategy_type']
+            config = data.get('config', {})
+        else:
+            return jsonify({'error': 'strategy_id or strategy_type is required'}), 400
+
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        start = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
+        # End date is inclusive
+        end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1, seconds=-1) if end_date else None
+
+        stream = spin_streams.load(
+            user_id=data.get('user_id'),
+            betting_house=data.get('betting_house'),
+            table_id=data.get('table_id') or data.get('market_id')
+        )
+        return jsonify(run_backtest(stream, strategy_type, config, start, end))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
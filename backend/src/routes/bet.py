@@ -1,38 +1,86 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from src.models.user import db
-from src.models.bet import Bet
-from datetime import datetime, date
+from src.models.bet import Bet, encode_bet_numbers, bets_query
+from src.models.profit_report import settlement_snapshot, apply_settlement, user_totals_query
+from datetime import datetime, date, timedelta
+import base64
 import json
 
 bet_bp = Blueprint('bet', __name__)
 
+# Page size of GET /bets when no limit is given, and the largest allowed
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Rows fetched per round trip (and per chunk written) when streaming NDJSON
+STREAM_BATCH_SIZE = 1000
+
+def encode_cursor(bet):
+    """Opaque cursor pointing just after a bet in (bet_time, id) descending order"""
+    payload = json.dumps([bet.bet_time.isoformat(), bet.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor):
+    """Returns the (bet_time, id) a cursor points after; ValueError if it is malformed"""
+    try:
+        bet_time, bet_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(bet_time), int(bet_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def _stream_ndjson(statement):
+    """Yields the bets of a select statement as NDJSON, one chunk per batch of rows"""
+    lines = []
+    for bet in db.session.scalars(statement.execution_options(yield_per=STREAM_BATCH_SIZE)):
+        lines.append(json.dumps(bet.to_dict()))
+        if len(lines) == STREAM_BATCH_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
 @bet_bp.route('/bets', methods=['GET'])
 def get_bets():
-    """Get bets for a user with optional filters"""
+    """Get bets for a user with optional filters, newest first.
+
+    Paginated by keyset: pass the X-Next-Cursor header of a page back as
+    `cursor` to get the next one (no header on the last page). With
+    format=ndjson every matching bet is streamed, one JSON object per line.
+    """
     user_id = request.args.get('user_id')
     strategy_id = request.args.get('strategy_id')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
+    cursor = request.args.get('cursor')
+    stream = request.args.get('format') == 'ndjson'
     
     if not user_id:
         return jsonify({'error': 'user_id is required'}), 400
     
     try:
-        query = Bet.query.filter_by(user_id=user_id)
-        
-        if strategy_id:
-            query = query.filter_by(strategy_id=strategy_id)
-        
-        if start_date:
-            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-            query = query.filter(Bet.bet_time >= start_date_obj)
+        # Pages are capped; a stream is unbounded unless a limit is given
+        limit = request.args.get('limit', None if stream else DEFAULT_PAGE_SIZE, type=int)
+        if limit is not None and (limit < 1 or (not stream and limit > MAX_PAGE_SIZE)):
+            return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+
+        start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        # Keyset: continue strictly after the last bet of the previous page
+        after = decode_cursor(cursor) if cursor else None
+        query = bets_query(user_id, strategy_id or None, start, end, after)
         
-        if end_date:
-            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-            query = query.filter(Bet.bet_time <= end_date_obj)
+        if stream:
+            if limit is not None:
+                query = query.limit(limit)
+            return Response(stream_with_context(_stream_ndjson(query)), mimetype='application/x-ndjson')
         
-        bets = query.order_by(Bet.bet_time.desc()).all()
-        return jsonify([bet.to_dict() for bet in bets])
+        # One extra row tells whether there is a next page
+        bets = db.session.scalars(query.limit(limit + 1)).all()
+        response = jsonify([bet.to_dict() for bet in bets[:limit]])
+        if len(bets) > limit:
+            response.headers['X-Next-Cursor'] = encode_cursor(bets[limit - 1])
+        return response
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -47,19 +95,26 @@ def create_bet():
             return jsonify({'error': f'{field} is required'}), 400
     
     try:
+        bet_numbers = json.dumps(data['bet_numbers']) if isinstance(data['bet_numbers'], (dict, list)) else data['bet_numbers']
+        coverage_mask, stake_cents = encode_bet_numbers(bet_numbers, data['bet_amount'])
         bet = Bet(
             user_id=data['user_id'],
             strategy_id=data['strategy_id'],
             betting_house=data['betting_house'],
             roulette_type=data['roulette_type'],
             bet_amount=data['bet_amount'],
-            bet_numbers=json.dumps(data['bet_numbers']) if isinstance(data['bet_numbers'], (dict, list)) else data['bet_numbers'],
+            bet_numbers=bet_numbers,
+            coverage_mask=coverage_mask,
+            stake_cents=stake_cents,
             outcome_number=data.get('outcome_number'),
             profit_loss=data.get('profit_loss', 0.0),
             status=data.get('status', 'pending')
         )
         
         db.session.add(bet)
+        db.session.flush()
+        # Bets recorded already settled count in the daily rollup right away
+        apply_settlement(db.session, None, settlement_snapshot(bet))
         db.session.commit()
         
         return jsonify(bet.to_dict()), 201
@@ -74,6 +129,7 @@ def update_bet(bet_id):
     
     try:
         bet = Bet.query.get_or_404(bet_id)
+        settled_before = settlement_snapshot(bet)
         
         if 'outcome_number' in data:
             bet.outcome_number = data['outcome_number']
@@ -82,6 +138,8 @@ def update_bet(bet_id):
         if 'status' in data:
             bet.status = data['status']
         
+        # The daily rollup is updated in the same transaction as the bet
+        apply_settlement(db.session, settled_before, settlement_snapshot(bet))
         db.session.commit()
         return jsonify(bet.to_dict())
     except Exception as e:
@@ -98,27 +156,20 @@ def get_bet_stats():
         return jsonify({'error': 'user_id is required'}), 400
     
     try:
-        query = Bet.query.filter_by(user_id=user_id)
-        
         # Filter by period
         if period == 'day':
-            today = date.today()
-            query = query.filter(Bet.bet_time >= today)
+            since = date.today()
         elif period == 'week':
-            from datetime import timedelta
-            week_ago = date.today() - timedelta(days=7)
-            query = query.filter(Bet.bet_time >= week_ago)
+            since = date.today() - timedelta(days=7)
         elif period == 'month':
-            from datetime import timedelta
-            month_ago = date.today() - timedelta(days=30)
-            query = query.filter(Bet.bet_time >= month_ago)
-        
-        bets = query.all()
+            since = date.today() - timedelta(days=30)
+        else:
+            since = None
         
-        total_bets = len(bets)
-        total_profit = sum(bet.profit_loss for bet in bets)
-        winning_bets = len([bet for bet in bets if bet.profit_loss > 0])
-        losing_bets = len([bet for bet in bets if bet.profit_loss < 0])
+        # A single SUM over the daily rollups (one row per day and strategy)
+        total_bets, total_profit, winning_bets, losing_bets = db.session.execute(
+            user_totals_query(user_id, since)
+        ).one()
         win_rate = (winning_bets / total_bets * 100) if total_bets > 0 else 0
         
         return jsonify({
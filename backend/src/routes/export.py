@@ -0,0 +1,140 @@
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app, send_file
+from src.models.user import db
+from src.models.export_job import ExportJob
+from src.export import (
+    FORMATS, STREAMED_FORMATS, ExportUnavailable, check_format, stream_export, export_batches, report_period
+)
+from src.export_jobs import ExportJobRunner, export_path
+from src.simulation_jobs import RUNNER_ID
+from datetime import datetime
+import json
+import os
+
+export_bp = Blueprint('export', __name__)
+export_runner = ExportJobRunner()
+
+def _export(name, export_format, params):
+    """Streams a CSV export as an attachment; other formats are built by an export job (202 with the job)"""
+    if export_format in STREAMED_FORMATS:
+        mimetype, extension = FORMATS[export_format]
+        columns, batches = export_batches(db.session, name, params)
+        return Response(
+            stream_with_context(stream_export(columns, batches)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f"attachment; filename={name}-{params['user_id']}.{extension}"}
+        )
+
+    job = ExportJob(
+        user_id=params['user_id'],
+        export=name,
+        format=export_format,
+        params_json=json.dumps({key: value for key, value in params.items() if key != 'user_id'}),
+        status='queued',
+        runner=RUNNER_ID
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    export_runner.submit(current_app._get_current_object(), job.id)
+    return jsonify(job.to_dict()), 202
+
+def _date_arg(name):
+    """A YYYY-MM-DD query argument, validated (ValueError if invalid)"""
+    value = request.args.get(name)
+    if value:
+        datetime.strptime(value, '%Y-%m-%d')
+    return value
+
+def _report_params(user_id):
+    """Export parameters of a report: start_date/end_date, or the last `days` days"""
+    start, end = report_period(_date_arg('start_date'), _date_arg('end_date'), request.args.get('days'))
+    return {'user_id': user_id, 'start_date': start.isoformat(), 'end_date': end.isoformat()}
+
+@export_bp.route('/exports/bets', methods=['GET'])
+def export_bets():
+    """Export every bet of a user (archived ones included) as CSV, XLSX or Parquet, oldest first"""
+    user_id = request.args.get('user_id', type=int)
+    export_format = request.args.get('format', 'csv')
+
+    if not user_id:
+        return jsonify({'error': 'user_id is required'}), 400
+
+    try:
+        check_format(export_format)
+        params = {
+            'user_id': user_id,
+            'strategy_id': request.args.get('strategy_id', type=int),
+            'start_date': _date_arg('start_date'),
+            'end_date': _date_arg('end_date')
+        }
+        return _export('bets', export_format, params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except ExportUnavailable as e:
+        return jsonify({'error': str(e)}), 501
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@export_bp.route('/exports/daily-profit', methods=['GET'])
+def export_daily_profit():
+    """Export the daily profit of a user (as in /reports/daily-profit)"""
+    user_id = request.args.get('user_id', type=int)
+    export_format = request.args.get('format', 'csv')
+
+    if not user_id:
+        return jsonify({'error': 'user_id is required'}), 400
+
+    try:
+        check_format(export_format)
+        return _export('daily-profit', export_format, _report_params(user_id))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except ExportUnavailable as e:
+        return jsonify({'error': str(e)}), 501
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@export_bp.route('/exports/strategy-performance', methods=['GET'])
+def export_strategy_performance():
+    """Export the performance of each strategy of a user (as in /reports/strategy-performance)"""
+    user_id = request.args.get('user_id', type=int)
+    export_format = request.args.get('format', 'csv')
+
+    if not user_id:
+        return jsonify({'error': 'user_id is required'}), 400
+
+    try:
+        check_format(export_format)
+        return _export('strategy-performance', export_format, _report_params(user_id))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except ExportUnavailable as e:
+        return jsonify({'error': str(e)}), 501
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@export_bp.route('/exports/jobs/<int:job_id>', methods=['GET'])
+def get_export_job(job_id):
+    """Get the status of an export job (download_url is set once the file is ready)"""
+    try:
+        job = ExportJob.query.get_or_404(job_id)
+        return jsonify(job.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@export_bp.route('/exports/jobs/<int:job_id>/download', methods=['GET'])
+def download_export(job_id):
+    """Download the file of a completed export job"""
+    job = ExportJob.query.get_or_404(job_id)
+    if job.status != 'completed':
+        return jsonify({'error': f'Export is {job.status}'}), 409
+
+    path = export_path(job)
+    if not os.path.exists(path):
+        return jsonify({'error': 'Export file is no longer available'}), 410
+    mimetype, extension = FORMATS[job.format]
+    return send_file(path, mimetype=mimetype, as_attachment=True,
+                     download_name=f'{job.export}-{job.user_id}.{extension}')
@@ -1,9 +1,7 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
-from src.models.bet import Bet
-from src.models.profit_report import ProfitReport
+from src.models.profit_report import strategy_totals, daily_totals_query
 from datetime import datetime, date, timedelta
-from sqlalchemy import func
 
 report_bp = Blueprint('report', __name__)
 
@@ -31,45 +29,24 @@ def get_profit_report():
             next_month = start_date.replace(month=start_date.month + 1) if start_date.month < 12 else start_date.replace(year=start_date.year + 1, month=1)
             end_date = next_month - timedelta(days=1)  # End of month
         
-        # Query bets in the period
-        bets = Bet.query.filter(
-            Bet.user_id == user_id,
-            Bet.bet_time >= start_date,
-            Bet.bet_time <= end_date
-        ).all()
+        # One GROUP BY over the daily rollups; the totals add up the strategy rows
+        strategy_stats = []
+        for row in strategy_totals(db.session, user_id, start_date, end_date):
+            strategy_stats.append({
+                'strategy_id': row.strategy_id,
+                'total_bets': row.total_bets,
+                'total_profit': float(row.total_profit),
+                'winning_bets': row.winning_bets,
+                'losing_bets': row.losing_bets,
+                'win_rate': (row.winning_bets / row.total_bets * 100) if row.total_bets > 0 else 0
+            })
         
-        # Calculate statistics
-        total_profit = sum(bet.profit_loss for bet in bets)
-        total_bets = len(bets)
-        winning_bets = len([bet for bet in bets if bet.profit_loss > 0])
-        losing_bets = len([bet for bet in bets if bet.profit_loss < 0])
+        total_profit = sum(stats['total_profit'] for stats in strategy_stats)
+        total_bets = sum(stats['total_bets'] for stats in strategy_stats)
+        winning_bets = sum(stats['winning_bets'] for stats in strategy_stats)
+        losing_bets = sum(stats['losing_bets'] for stats in strategy_stats)
         win_rate = (winning_bets / total_bets * 100) if total_bets > 0 else 0
         
-        # Group by strategy
-        strategy_stats = {}
-        for bet in bets:
-            strategy_id = bet.strategy_id
-            if strategy_id not in strategy_stats:
-                strategy_stats[strategy_id] = {
-                    'strategy_id': strategy_id,
-                    'total_bets': 0,
-                    'total_profit': 0,
-                    'winning_bets': 0,
-                    'losing_bets': 0
-                }
-            
-            strategy_stats[strategy_id]['total_bets'] += 1
-            strategy_stats[strategy_id]['total_profit'] += bet.profit_loss
-            if bet.profit_loss > 0:
-                strategy_stats[strategy_id]['winning_bets'] += 1
-            elif bet.profit_loss < 0:
-                strategy_stats[strategy_id]['losing_bets'] += 1
-        
-        # Calculate win rate for each strategy
-        for strategy_id in strategy_stats:
-            stats = strategy_stats[strategy_id]
-            stats['win_rate'] = (stats['winning_bets'] / stats['total_bets'] * 100) if stats['total_bets'] > 0 else 0
-        
         return jsonify({
             'period': period,
             'start_date': start_date.isoformat(),
@@ -79,7 +56,7 @@ def get_profit_report():
             'winning_bets': winning_bets,
             'losing_bets': losing_bets,
             'win_rate': win_rate,
-            'strategy_breakdown': list(strategy_stats.values())
+            'strategy_breakdown': strategy_stats
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -97,16 +74,8 @@ def get_daily_profit():
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
-        # Query bets grouped by date
-        daily_profits = db.session.query(
-            func.date(Bet.bet_time).label('bet_date'),
-            func.sum(Bet.profit_loss).label('daily_profit'),
-            func.count(Bet.id).label('bet_count')
-        ).filter(
-            Bet.user_id == user_id,
-            Bet.bet_time >= start_date,
-            Bet.bet_time <= end_date
-        ).group_by(func.date(Bet.bet_time)).all()
+        # Daily rollups summed over strategies
+        daily_profits = db.session.execute(daily_totals_query(user_id, start_date, end_date)).all()
         
         # Create a complete date range with zero profits for missing days
         date_range = []
@@ -148,18 +117,8 @@ def get_strategy_performance():
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
-        # Query strategy performance
-        strategy_performance = db.session.query(
-            Bet.strategy_id,
-            func.sum(Bet.profit_loss).label('total_profit'),
-            func.count(Bet.id).label('total_bets'),
-            func.sum(func.case([(Bet.profit_loss > 0, 1)], else_=0)).label('winning_bets'),
-            func.sum(func.case([(Bet.profit_loss < 0, 1)], else_=0)).label('losing_bets')
-        ).filter(
-            Bet.user_id == user_id,
-            Bet.bet_time >= start_date,
-            Bet.bet_time <= end_date
-        ).group_by(Bet.strategy_id).all()
+        # Strategy performance from the daily rollups
+        strategy_performance = strategy_totals(db.session, user_id, start_date, end_date)
         
         result = []
         for row in strategy_performance:
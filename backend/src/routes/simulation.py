@@ -0,0 +1,107 @@
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import update
+from src.models.user import db
+from src.models.simulation_job import SimulationJob
+from src.roulette_simulator import WHEEL_MODELS
+from src.strategies.strategy_logic import get_strategy_class
+from src.simulation_jobs import SimulationJobRunner, job_cache_key, new_seed, RUNNER_ID
+import json
+
+simulation_bp = Blueprint('simulation', __name__)
+job_runner = SimulationJobRunner()
+
+@simulation_bp.route('/simulations', methods=['POST'])
+def create_simulation():
+    """Submit a simulation job (served from the result cache when possible)"""
+    data = request.get_json()
+
+    if not data or 'strategy_type' not in data:
+        return jsonify({'error': 'strategy_type is required'}), 400
+    if get_strategy_class(data['strategy_type']) is None:
+        return jsonify({'error': f"Unknown strategy type: {data['strategy_type']}"}), 400
+
+    try:
+        num_spins = int(data.get('num_spins', 1000))
+        wheel = data.get('wheel', 'european')
+        if num_spins <= 0:
+            return jsonify({'error': 'num_spins must be positive'}), 400
+        if wheel not in WHEEL_MODELS:
+            return jsonify({'error': f'wheel must be one of {sorted(WHEEL_MODELS)}'}), 400
+
+        config = data.get('config', {})
+        seeded = data.get('seed') is not None
+        seed = int(data['seed']) if seeded else new_seed()
+        cache_key = job_cache_key(data['strategy_type'], config, seed, num_spins, wheel)
+
+        # Same strategy, config, seed and spins: reuse the finished (or running) job
+        if seeded:
+            for job in SimulationJob.query.filter_by(cache_key=cache_key).order_by(SimulationJob.id.desc()).all():
+                if job.status == 'completed' or (job.status in ('queued', 'running') and job_runner.is_active(job.id)):
+                    return jsonify(dict(job.to_dict(), cached=True)), 200
+
+        job = SimulationJob(
+            user_id=data.get('user_id'),
+            strategy_type=data['strategy_type'],
+            config_json=json.dumps(config),
+            num_spins=num_spins,
+            seed=str(seed),
+            wheel=wheel,
+            cache_key=cache_key,
+            status='queued',
+            runner=RUNNER_ID
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        job_runner.submit(current_app._get_current_object(), job.id)
+        return jsonify(dict(job.to_dict(), cached=False)), 202
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@simulation_bp.route('/simulations', methods=['GET'])
+def get_simulations():
+    """List simulation jobs, optionally filtered by user and status"""
+    user_id = request.args.get('user_id')
+    status = request.args.get('status')
+
+    try:
+        query = SimulationJob.query
+        if user_id:
+            query = query.filter_by(user_id=user_id)
+        if status:
+            query = query.filter_by(status=status)
+
+        jobs = query.order_by(SimulationJob.id.desc()).limit(100).all()
+        return jsonify([job.to_dict() for job in jobs])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@simulation_bp.route('/simulations/<int:job_id>', methods=['GET'])
+def get_simulation(job_id):
+    """Get the status, progress and result of a simulation job"""
+    try:
+        job = SimulationJob.query.get_or_404(job_id)
+        return jsonify(job.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@simulation_bp.route('/simulations/<int:job_id>/cancel', methods=['POST'])
+def cancel_simulation(job_id):
+    """Cancel a queued or running simulation job"""
+    try:
+        job = SimulationJob.query.get_or_404(job_id)
+        # Conditional UPDATE: a job that finished meanwhile is not overwritten
+        cancelled = db.session.execute(update(SimulationJob).where(
+            SimulationJob.id == job_id, SimulationJob.status.in_(('queued', 'running'))
+        ).values(status='cancelled')).rowcount
+        db.session.commit()
+        db.session.refresh(job)
+        if cancelled == 0:
+            return jsonify({'error': f'Job is already {job.status}'}), 409
+        return jsonify(job.to_dict())
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
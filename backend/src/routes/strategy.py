@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.strategy import Strategy
+from src.strategies.strategy_logic import evict_compiled_strategy
 import json
 
 strategy_bp = Blueprint('strategy', __name__)
@@ -127,6 +128,7 @@ def delete_strategy(strategy_id):
         strategy = Strategy.query.get_or_404(strategy_id)
         db.session.delete(strategy)
         db.session.commit()
+        evict_compiled_strategy(strategy_id)
         return jsonify({'message': 'Strategy deleted successfully'})
     except Exception as e:
         db.session.rollback()
@@ -147,3 +149,18 @@ def toggle_strategy(strategy_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@strategy_bp.route('/strategies/analyze', methods=['POST'])
+def analyze_strategy_config():
+    """Exact long-run trigger rate, EV and variance for a strategy type and config"""
+    data = request.get_json()
+    
+    if not data or 'strategy_type' not in data:
+        return jsonify({'error': 'strategy_type is required'}), 400
+    
+    try:
+        from src.strategy_analysis import analyze_strategy
+        return jsonify(analyze_strategy(data['strategy_type'], data.get('config', {})))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,143 @@
+from sqlalchemy import update, select, case, or_, and_, false, func
+from src.models.bet import Bet, STRAIGHT_UP_PAYOUT
+from src.models.spin import Spin, parse_spin_number, parse_market_version
+from src.models.profit_report import apply_rollup_deltas
+from src.strategies.numset import WHEEL_SIZE
+
+# Statuses of bets still waiting for the spin they were placed on
+PENDING_STATUSES = ('pending', 'pending_placement')
+
+
+def covers(outcome_number):
+    """SQL condition: the bet covers the outcome.
+
+    An integer AND on coverage_mask; rows not migrated yet (no mask) fall
+    back to matching their JSON number list (json.dumps format) as text.
+    """
+    bet = Bet.__table__
+    number = int(outcome_number)
+    masked = bet.c.coverage_mask.bitwise_and(1 << number) != 0 if 0 <= number < WHEEL_SIZE else false()
+    unmigrated = or_(
+        bet.c.bet_numbers == f'[{number}]',
+        bet.c.bet_numbers.like(f'[{number},%'),
+        bet.c.bet_numbers.like(f'%, {number},%'),
+        bet.c.bet_numbers.like(f'%, {number}]')
+    )
+    return or_(
+        and_(bet.c.coverage_mask.is_not(None), masked),
+        and_(bet.c.coverage_mask.is_(None), unmigrated)
+    )
+
+
+def pending_conditions(betting_house, table_id=None, user_id=None):
+    """Filter for the pending bets of a table, or of a user's stream without table."""
+    bet = Bet.__table__
+    conditions = [bet.c.status.in_(PENDING_STATUSES), bet.c.betting_house == betting_house]
+    if table_id is not None:
+        conditions.append(bet.c.table_id == str(table_id))
+    else:
+        conditions += [bet.c.table_id.is_(None), bet.c.user_id == user_id]
+    return conditions
+
+
+def settled_spin_bound(session, betting_house, table_id=None, user_id=None, spin_id=None, market_version=None):
+    """Id of the Spin row of the spin being settled, or None if it is not recorded yet.
+
+    The spin is identified by `spin_id` (returned by process_spin and
+    process_table_spin) or by its `market_version`. Bets generated by that
+    spin, or by later ones, are placed on a later spin and must stay pending,
+    whether settlement is called before or after the spin is processed.
+    """
+    if spin_id is not None:
+        spin = session.get(Spin, int(spin_id))
+        stream_matches = spin is not None and spin.betting_house == betting_house and (
+            spin.table_id == str(table_id) if table_id is not None else spin.user_id == user_id
+        )
+        if not stream_matches:
+            raise ValueError(f"Spin {spin_id} not found for this table or user")
+        return spin.id
+    if market_version is None:
+        raise ValueError("spin_id or market_version is required to identify the settled spin")
+    conditions = [Spin.betting_house == betting_house, Spin.market_version == parse_market_version(market_version)]
+    if table_id is not None:
+        # Every recording of the spin counts, per table or reported by users on the table
+        conditions.append(Spin.table_id == str(table_id))
+    else:
+        conditions.append(Spin.user_id == user_id)
+    return session.execute(select(func.min(Spin.id)).where(*conditions)).scalar()
+
+
+def pending_exposure(session, betting_house, table_id=None, user_id=None):
+    """Stake on each number across the pending bets of a table: {number: amount}.
+    One query; every number is an integer AND on the coverage mask.
+    """
+    bet = Bet.__table__
+    # Sub-cent stakes have no stake_cents (see encode_bet_numbers)
+    cents = func.coalesce(bet.c.stake_cents, bet.c.bet_amount * 100)
+    stakes = session.execute(select(*(
+        func.sum(case((bet.c.coverage_mask.bitwise_and(1 << number) != 0, cents), else_=0))
+        for number in range(WHEEL_SIZE)
+    )).where(*pending_conditions(betting_house, table_id, user_id))).one()
+    return {number: cents / 100 for number, cents in enumerate(stakes) if cents}
+
+
+def settle_spin(session, betting_house, outcome_number, table_id=None, user_id=None, spin_id=None,
+                market_version=None):
+    """Settles the pending bets of a table (or of a user's stream without table) on a spin.
+
+    Only bets generated before the spin was recorded are settled (see
+    settled_spin_bound), so the call can come before or after the spin is
+    processed. One UPDATE computes status and profit_loss in SQL and returns
+    the settled rows; their totals go to the daily rollups in the same
+    transaction. The caller commits. Raises ValueError for an invalid
+    outcome or an unknown spin.
+    Returns a summary of the settlement.
+    """
+    bet = Bet.__table__
+    outcome_number = parse_spin_number(outcome_number)
+    conditions = pending_conditions(betting_house, table_id, user_id)
+    bound = settled_spin_bound(session, betting_house, table_id, user_id, spin_id, market_version)
+    if bound is not None:
+        # Bets from before spin ids were recorded are older than any spin settled now
+        conditions.append(or_(bet.c.spin_id < bound, bet.c.spin_id.is_(None)))
+    won = covers(outcome_number)
+    # Integer payout in cents; rows not migrated yet use bet_amount
+    payout_cents = case((won, bet.c.stake_cents * STRAIGHT_UP_PAYOUT), else_=-bet.c.stake_cents)
+    unmigrated_payout = case((won, bet.c.bet_amount * STRAIGHT_UP_PAYOUT), else_=-bet.c.bet_amount)
+    # A Core UPDATE: no ORM bookkeeping for rows that are never loaded as objects
+    settled = session.execute(
+        update(bet).where(*conditions).values(
+            outcome_number=outcome_number,
+            status=case((won, 'won'), else_='lost'),
+            profit_loss=func.coalesce(payout_cents / 100.0, unmigrated_payout)
+        ).returning(bet.c.user_id, bet.c.strategy_id, bet.c.bet_time, bet.c.bet_amount, bet.c.profit_loss)
+    ).all()
+
+    # The settled bets were pending, so they only add to their rollup rows
+    deltas = {}
+    for bet_user_id, bet_strategy_id, bet_time, bet_amount, profit_loss in settled:
+        key = (bet_user_id, bet_strategy_id, bet_time.date())
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = {
+                'daily_profit': 0.0, 'total_stake': 0.0, 'total_bets': 0, 'winning_bets': 0, 'losing_bets': 0
+            }
+        delta['daily_profit'] += profit_loss
+        delta['total_stake'] += bet_amount
+        delta['total_bets'] += 1
+        if profit_loss > 0:
+            delta['winning_bets'] += 1
+        elif profit_loss < 0:
+            delta['losing_bets'] += 1
+    apply_rollup_deltas(session, deltas)
+
+    return {
+        'outcome_number': outcome_number,
+        'spin_id': bound,
+        'bets_settled': len(settled),
+        'winning_bets': sum(delta['winning_bets'] for delta in deltas.values()),
+        'losing_bets': sum(delta['losing_bets'] for delta in deltas.values()),
+        'total_stake': sum(delta['total_stake'] for delta in deltas.values()),
+        'total_profit': sum(delta['daily_profit'] for delta in deltas.values()),
+        'strategies': len({(user_id, strategy_id) for user_id, strategy_id, _ in deltas})
+    }
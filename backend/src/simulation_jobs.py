@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+import numpy as np
+from src.roulette_simulator import WHEEL_MODELS
+from src.vectorized_simulation import VectorizedSimulation
+
+# Background threads per app process running simulation jobs
+DEFAULT_JOB_WORKERS = int(os.environ.get("SIMULATION_JOB_WORKERS", "2"))
+
+# Identifies this process in SimulationJob.runner
+RUNNER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Summary keys kept in the stored result (bet history is left out)
+RESULT_KEYS = (
+    "num_spins", "triggers", "total_profit", "total_bets", "winning_bets", "losing_bets",
+    "win_rate", "avg_profit_per_bet", "avg_profit_per_trigger", "std_profit_per_trigger",
+    "max_drawdown", "longest_losing_streak", "current_losing_streak"
+)
+
+
+def job_cache_key(strategy_type, config, seed, num_spins, wheel):
+    """Identifies the result of a simulation; equal keys give equal results."""
+    payload = json.dumps([strategy_type, config, str(seed), num_spins, wheel], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def compact_result(summary):
+    """Final statistics of a simulation summary, without the bet history."""
+    return {key: summary[key] for key in RESULT_KEYS}
+
+
+class SimulationJobRunner:
+    """Runs SimulationJob rows on a background thread pool.
+
+    Requests only insert the job and return; a pool thread runs the
+    vectorized simulation chunk by chunk, saving the partial statistics
+    after each chunk and stopping early when the job is cancelled. The
+    NumPy work of each chunk runs outside the GIL for most of its time, so
+    request threads stay responsive.
+    """
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._active = set()
+        self._lock = Lock()
+
+    def submit(self, app, job_id):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="simulation-job")
+            self._active.add(job_id)
+        self._executor.submit(self._run, app, job_id)
+
+    def is_active(self, job_id):
+        """True if the job is queued or running in this process."""
+        return job_id in self._active
+
+    def _run(self, app, job_id):
+        from sqlalchemy import update
+        from src.models.user import db
+        from src.models.simulation_job import SimulationJob
+
+        def transition(from_status, **values):
+            # Conditional UPDATE: a cancel committed meanwhile is never overwritten
+            changed = db.session.execute(update(SimulationJob).where(
+                SimulationJob.id == job_id, SimulationJob.status == from_status
+            ).values(**values)).rowcount
+            db.session.commit()
+            return changed == 1
+
+        with app.app_context():
+            try:
+                job = SimulationJob.query.get(job_id)
+                if job is None or not transition('queued', status='running'):
+                    return
+                db.session.refresh(job)
+
+                # Progress is saved (and cancellation checked) once per chunk of spins.
+                # The default chunk size keeps results equal to VectorizedSimulation(seed)
+                simulation = VectorizedSimulation(seed=int(job.seed), wheel=WHEEL_MODELS[job.wheel])
+                summary = None
+                for summary in simulation.stream_simulation(job.strategy_type, job.get_config(), job.num_spins, last_k=0):
+                    if not transition('running', spins_done=summary["spins_done"],
+                                      progress_json=json.dumps(compact_result(summary))):
+                        break
+                else:
+                    if transition('running', result_json=json.dumps(compact_result(summary)), progress_json=None,
+                                  status='completed', finished_at=datetime.utcnow()):
+                        return
+                # Cancelled while running
+                transition('cancelled', finished_at=datetime.utcnow())
+            except Exception as e:
+                db.session.rollback()
+                db.session.execute(update(SimulationJob).where(
+                    SimulationJob.id == job_id, SimulationJob.status.in_(('queued', 'running'))
+                ).values(status='failed', error=str(e), finished_at=datetime.utcnow()))
+                db.session.commit()
+            finally:
+                db.session.remove()
+                with self._lock:
+                    self._active.discard(job_id)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def fail_orphaned_jobs(session, model=None):
+    """Marks failed the queued and running jobs whose process is gone.
+
+    A job belongs to the process that accepted it (the runner column of
+    `model`, SimulationJob by default). Jobs of processes on this host that
+    no longer exist, and jobs from before runners were recorded, can never
+    finish. Jobs of other hosts are left to those hosts. Returns the number
+    of jobs marked failed. The caller commits.
+    """
+    from sqlalchemy import update
+    from src.models.simulation_job import SimulationJob
+
+    model = model or SimulationJob
+    host = socket.gethostname()
+    orphaned = []
+    for job_id, runner in session.query(model.id, model.runner).filter(
+        model.status.in_(('queued', 'running'))
+    ):
+        runner_host, _, pid = (runner or '').rpartition(':')
+        if runner is None or (runner_host == host and pid.isdigit() and not _process_alive(int(pid))):
+            orphaned.append(job_id)
+    if not orphaned:
+        return 0
+    return session.execute(update(model).where(
+        model.id.in_(orphaned), model.status.in_(('queued', 'running'))
+    ).values(
+        status='failed', error='The process running the job stopped', finished_at=datetime.utcnow()
+    )).rowcount
+
+
+def new_seed():
+    """Random seed for jobs submitted without one (stored so the run can be reproduced)."""
+    return int(np.random.SeedSequence().entropy)
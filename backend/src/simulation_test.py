@@ -1,65 +1,59 @@
 import random
+from collections import deque
 from src.strategies.strategy_logic import StrategyLogic
 from src.roulette_simulator import RouletteSimulator
 import json
 
 class StrategySimulation:
-    def __init__(self):
+    def __init__(self, wheel=None):
         self.strategy_logic = StrategyLogic()
-        self.roulette_simulator = RouletteSimulator()
+        self.roulette_simulator = RouletteSimulator(wheel=wheel)
 
     def run_simulation(self, strategy_type, config, num_spins=1000):
         """Runs a simulation for a given strategy over a specified number of spins."""
-        history = []
+        trigger = self.strategy_logic.create_trigger(strategy_type, config)
+        template = self.strategy_logic.get_bet_template(strategy_type, config)
+        max_entries = max(1, int(config.get("max_entries", 1)))
         total_profit = 0
         total_bets = 0
         winning_bets = 0
         losing_bets = 0
-        bet_history = []
+        bet_history = deque(maxlen=50)  # Keep last 50 for analysis
+        entries_left = 0  # Spins still to bet on after the latest trigger
 
         for spin in range(num_spins):
             # Simulate a spin
             winning_number = self.roulette_simulator.spin()
-            history.insert(0, winning_number)  # Add to front (most recent first)
-            
-            # Keep history manageable (last 20 spins)
-            if len(history) > 20:
-                history = history[:20]
 
-            # Execute strategy based on current history
-            if strategy_type == "terminal_8":
-                bets = self.strategy_logic.execute_strategy_terminal_8(history, config)
-            elif strategy_type == "3x3_pattern":
-                bets = self.strategy_logic.execute_strategy_3x3_pattern(history, config)
-            elif strategy_type == "2x7_pattern":
-                bets = self.strategy_logic.execute_strategy_2x7_pattern(history, config)
-            else:
-                bets = []
+            # Settle the bets placed on this spin, if any
+            if entries_left:
+                stake_on_winner = template.stake_on(winning_number)
+                # Straight-up bets: the covered number pays 36x, every other bet loses
+                spin_profit = stake_on_winner * 36 - (template.total_stake - stake_on_winner)
+                total_bets += len(template.bets)
 
-            # Process bets if any
-            if bets:
-                spin_profit = 0
-                for bet in bets:
-                    bet_number = bet["number"]
-                    bet_amount = bet["amount"]
-                    payout = self.roulette_simulator.calculate_payout(bet_number, bet_amount, winning_number)
-                    spin_profit += payout
-                    total_bets += 1
-                    
-                    if payout > 0:
-                        winning_bets += 1
-                    else:
-                        losing_bets += 1
+                if stake_on_winner > 0:
+                    winning_bets += 1
+                    losing_bets += len(template.bets) - 1
+                    entries_left = 0
+                else:
+                    losing_bets += len(template.bets)
+                    entries_left -= 1
 
                 total_profit += spin_profit
                 bet_history.append({
                     "spin": spin + 1,
                     "winning_number": winning_number,
-                    "bets": bets,
+                    "bets": list(template.bets),
                     "profit": spin_profit,
                     "cumulative_profit": total_profit
                 })
 
+            # Bets generated by a trigger are placed on the following spins,
+            # up to max_entries times until one of them hits
+            if trigger is not None and trigger.feed(winning_number):
+                entries_left = max_entries
+
         # Calculate statistics
         win_rate = (winning_bets / total_bets * 100) if total_bets > 0 else 0
         avg_profit_per_bet = total_profit / total_bets if total_bets > 0 else 0
@@ -74,9 +68,17 @@ class StrategySimulation:
             "losing_bets": losing_bets,
             "win_rate": win_rate,
             "avg_profit_per_bet": avg_profit_per_bet,
-            "bet_history": bet_history[-50:]  # Keep last 50 for analysis
+            "bet_history": list(bet_history)
         }
 
+    def run_bankroll_paths(self, strategy_type, config, num_paths=1000, num_spins=1000, bankroll=None, seed=None):
+        """Runs many independent bankroll paths of a strategy at once (see BankrollSimulation).
+        Returns drawdown, losing streak and time-to-ruin distributions and profit percentile bands.
+        """
+        from src.bankroll_simulation import BankrollSimulation
+        simulation = BankrollSimulation(seed=seed, wheel=self.roulette_simulator.wheel)
+        return simulation.run_paths(strategy_type, config, num_paths, num_spins, bankroll)
+
     def compare_strategies(self, num_spins=1000):
         """Compares all three strategies over the same number of spins."""
         strategies = [
@@ -0,0 +1,107 @@
+from functools import lru_cache
+
+WHEEL_SIZE = 37  # European wheel: 0-36
+
+
+class NumSet:
+    """Immutable set of roulette numbers stored as a 37-bit integer mask.
+
+    Membership, union and intersection are single integer operations, so
+    strategy lists can be tested on every spin without hashing or scanning.
+    """
+
+    __slots__ = ("mask",)
+
+    def __init__(self, numbers=()):
+        mask = 0
+        for number in numbers:
+            if not 0 <= number < WHEEL_SIZE:
+                raise ValueError(f"Invalid roulette number: {number}")
+            mask |= 1 << number
+        object.__setattr__(self, "mask", mask)
+
+    @classmethod
+    def from_mask(cls, mask):
+        """Builds a set directly from a bit mask."""
+        if mask < 0 or mask >> WHEEL_SIZE:
+            raise ValueError(f"Invalid roulette mask: {mask:#x}")
+        numset = cls.__new__(cls)
+        object.__setattr__(numset, "mask", mask)
+        return numset
+
+    def __setattr__(self, name, value):
+        raise AttributeError("NumSet is immutable")
+
+    def __contains__(self, number):
+        return 0 <= number < WHEEL_SIZE and (self.mask >> number) & 1 == 1
+
+    def __iter__(self):
+        mask = self.mask
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __or__(self, other):
+        return NumSet.from_mask(self.mask | other.mask)
+
+    def __and__(self, other):
+        return NumSet.from_mask(self.mask & other.mask)
+
+    def __sub__(self, other):
+        return NumSet.from_mask(self.mask & ~other.mask)
+
+    def __eq__(self, other):
+        return isinstance(other, NumSet) and self.mask == other.mask
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __repr__(self):
+        return f"NumSet({list(self)})"
+
+
+WHEEL = NumSet(range(WHEEL_SIZE))
+
+
+class BetTemplate:
+    """Precomputed straight-up bets of a strategy for a given chip value.
+
+    `bets` holds the bet dicts in placement order and is shared between
+    triggers, so callers must not mutate them. `stakes` is indexed by the
+    roulette number, which turns payout lookups into a single index.
+    """
+
+    __slots__ = ("bets", "coverage", "stakes", "total_stake")
+
+    def __init__(self, chips_by_number, chip_value):
+        self.bets = tuple(
+            {"number": number, "amount": chip_value * chips}
+            for number, chips in chips_by_number
+        )
+        self.coverage = NumSet(number for number, _ in chips_by_number)
+        stakes = [0.0] * WHEEL_SIZE
+        for bet in self.bets:
+            stakes[bet["number"]] += bet["amount"]
+        self.stakes = tuple(stakes)
+        self.total_stake = sum(stakes)
+
+    def hits(self, winning_number):
+        """True if the winning number is covered by the template."""
+        return (self.coverage.mask >> winning_number) & 1 == 1
+
+    def stake_on(self, winning_number):
+        """Amount staked on the winning number (0 for pockets outside 0-36, e.g. 00)."""
+        return self.stakes[winning_number] if winning_number < WHEEL_SIZE else 0.0
+
+
+@lru_cache(maxsize=1024)
+def bet_template(chips_by_number, chip_value):
+    """Returns the cached template for ((number, chips), ...) at `chip_value`."""
+    return BetTemplate(chips_by_number, chip_value)
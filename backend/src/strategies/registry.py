@@ -0,0 +1,100 @@
+from abc import ABC, abstractmethod
+from threading import Lock
+from src.strategies.numset import bet_template
+
+# strategy_type -> CompiledStrategy subclass
+STRATEGY_TYPES = {}
+
+# strategy_id -> (cache key, compiled strategy)
+_compiled_cache = {}
+_cache_lock = Lock()
+
+
+def register_strategy(strategy_type):
+    """Class decorator that registers a CompiledStrategy subclass for a strategy type."""
+    def decorator(cls):
+        cls.strategy_type = strategy_type
+        STRATEGY_TYPES[strategy_type] = cls
+        return cls
+    return decorator
+
+
+class CompiledStrategy(ABC):
+    """A strategy type bound to a parsed config.
+
+    Subclasses provide `chips` ((number, chips), ...) and `create_trigger`.
+    Everything derived from the config (bet template, betting houses) is
+    built once here, so evaluating a spin does no parsing or dispatch.
+
+    `max_entries` is the number of consecutive spins bet on after a trigger
+    in simulations, backtests, sweeps and the Markov analysis: entries stop
+    at the first hit or when a newer trigger starts over. Live evaluation
+    bets once per trigger, whatever the stored config says.
+    """
+
+    strategy_type = None
+    chips = ()
+
+    def __init__(self, config):
+        self.config = config
+        self.chip_value = config.get("chip_value", 1.0)
+        self.max_entries = max(1, int(config.get("max_entries", 1)))
+        self.betting_houses = frozenset(config.get("betting_houses", []))
+        self.template = bet_template(self.chips, self.chip_value)
+        self.trigger = self.create_trigger()
+
+    @abstractmethod
+    def create_trigger(self):
+        """Returns a fresh incremental trigger (SequenceTrigger, RunTrigger, ...)."""
+
+    @property
+    def trigger_key(self):
+        """Identifies the trigger; strategies sharing a key fire on the same spins."""
+        return self.strategy_type
+
+    def accepts(self, betting_house):
+        """Checks if the strategy is configured for a betting house."""
+        return betting_house in self.betting_houses
+
+    def evaluate(self, history):
+        """Returns the bets to place given the history (most recent first)."""
+        if self.trigger.matches(history):
+            return list(self.template.bets)
+        return []
+
+
+def get_strategy_class(strategy_type):
+    """Returns the registered class for a strategy type, or None."""
+    return STRATEGY_TYPES.get(strategy_type)
+
+
+def compile_strategy(strategy_type, config):
+    """Builds a CompiledStrategy from a type and config dict (None if the type is unknown)."""
+    cls = STRATEGY_TYPES.get(strategy_type)
+    if cls is None:
+        return None
+    return cls(config)
+
+
+def get_compiled_strategy(strategy):
+    """Returns the cached CompiledStrategy for a Strategy model.
+
+    Instances are keyed by the strategy id and rebuilt only when the type,
+    `config_json` or `updated_at` change, so `config_json` is parsed once
+    per edit instead of once per spin.
+    """
+    key = (strategy.strategy_type, strategy.config_json, strategy.updated_at)
+    cached = _compiled_cache.get(strategy.id)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    compiled = compile_strategy(strategy.strategy_type, strategy.get_config())
+    with _cache_lock:
+        _compiled_cache[strategy.id] = (key, compiled)
+    return compiled
+
+
+def evict_compiled_strategy(strategy_id):
+    """Drops the cached instance of a strategy (e.g. after it is deleted)."""
+    with _cache_lock:
+        _compiled_cache.pop(strategy_id, None)
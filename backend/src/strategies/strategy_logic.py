@@ -1,126 +1,146 @@
-import json
+from src.strategies.numset import NumSet
+from src.strategies.triggers import SequenceTrigger, RunTrigger
+from src.strategies.registry import (
+    CompiledStrategy,
+    register_strategy,
+    get_strategy_class,
+    compile_strategy,
+    get_compiled_strategy,
+    evict_compiled_strategy,
+)
+
+# Gatilhos válidos (4 formas):
+# 1. Consecutivo: 1 → 6 → 8
+# 2. Intervalo 1 casa: 1 [x] 6 [x] 8
+# 3. Intervalo 2 casas: 1 [xx] 6 [xx] 8
+# 4. Intervalo 3 casas: 1 [xxx] 6 [xxx] 8
+TERMINAL_8_PATTERN = (1, 6, 8)
+TERMINAL_8_GAPS = (0, 1, 2, 3)
+
+LIST_3X3 = NumSet([0, 3, 4, 12, 15, 19, 21, 26, 28, 32, 35])
+LIST_2X7 = NumSet([2, 4, 7, 12, 17, 18, 19, 21, 22, 25, 28, 29, 34, 35])
+
+# Fichas por número, na ordem em que as apostas são colocadas
+TERMINAL_8_CHIPS = ((12, 1), (28, 1), (7, 1), (29, 1), (18, 1), (22, 1), (8, 1), (11, 1), (14, 1), (30, 2))
+CHIPS_3X3 = tuple((num, 2 if num == 0 else 1) for num in LIST_3X3)
+CHIPS_2X7 = tuple((num, 1) for num in LIST_2X7)
+
+
+@register_strategy("terminal_8")
+class Terminal8Strategy(CompiledStrategy):
+    """Strategy 1: Buscar Terminal (8) pelo padrão 1→6."""
+
+    # Apostas:
+    # 1 ficha em: 12, 28, 7, 29, 18, 22, 8, 11, 14
+    # 2 fichas no: 30
+    chips = TERMINAL_8_CHIPS
+
+    def create_trigger(self):
+        # Gatilho: padrão 1 → 6 → 8 (consecutivo ou com intervalo de 1 a 3 casas)
+        # terminando no número mais recente
+        return SequenceTrigger(TERMINAL_8_PATTERN, TERMINAL_8_GAPS)
+
+
+class ListPatternStrategy(CompiledStrategy):
+    """Base for the list strategies: trigger on `run_length` consecutive numbers
+    of the list, then bet on every number of the list.
+
+    The list can be replaced per strategy with the config key "numbers".
+    """
+
+    numbers = NumSet()
+    zero_chips = 1
+    run_length = 3
+
+    def __init__(self, config):
+        numbers = config.get("numbers")
+        if numbers:
+            self.numbers = NumSet(numbers)
+            self.chips = tuple((num, self.zero_chips if num == 0 else 1) for num in self.numbers)
+        super().__init__(config)
+
+    @property
+    def trigger_key(self):
+        if self.numbers == type(self).numbers:
+            return self.strategy_type
+        return (self.strategy_type, self.numbers.mask)
+
+    def create_trigger(self):
+        return RunTrigger(self.numbers, self.run_length)
+
+
+@register_strategy("3x3_pattern")
+class Pattern3x3Strategy(ListPatternStrategy):
+    """Strategy 2: Padrão 3x3."""
+
+    # Gatilho: Se 3 números consecutivos da lista saírem
+    # Apostas:
+    # 1 ficha em cada número da lista.
+    # 2 fichas no 0.
+    numbers = LIST_3X3
+    zero_chips = 2
+    chips = CHIPS_3X3
+
+
+@register_strategy("2x7_pattern")
+class Pattern2x7Strategy(ListPatternStrategy):
+    """Strategy 3: Padrão 2x7."""
+
+    # Gatilho: Se 3 números consecutivos da lista saírem
+    # Apostas:
+    # 1 ficha em cada número da lista.
+    numbers = LIST_2X7
+    chips = CHIPS_2X7
+
 
 class StrategyLogic:
     def __init__(self):
         pass
 
-    def _check_pattern(self, history, pattern):
-        """Checks if a given pattern exists in the history."""
-        if len(history) < len(pattern):
-            return False
-        
-        # Simple check for consecutive pattern
-        if len(pattern) == 3 and pattern[0] == 1 and pattern[1] == 6 and pattern[2] == 8:
-            for i in range(len(history) - 2):
-                if history[i] == 1 and history[i+1] == 6 and history[i+2] == 8:
-                    return True
-        
-        # More complex pattern matching with intervals would go here
-        # For now, let's assume a simplified check for demonstration
-        
-        return False
+    def create_trigger(self, strategy_type, config=None):
+        """Returns a fresh incremental trigger for a strategy type (None if unknown).
+        Feed it one number per spin; it reports triggers in constant time per spin.
+        """
+        strategy = compile_strategy(strategy_type, config or {})
+        return strategy.create_trigger() if strategy is not None else None
+
+    def get_bet_template(self, strategy_type, config):
+        """Returns the precomputed BetTemplate a strategy places once its trigger fires
+        (None if the strategy type is unknown).
+        """
+        strategy = compile_strategy(strategy_type, config)
+        return strategy.template if strategy is not None else None
+
+    def get_strategy_bets(self, strategy_type, config):
+        """Returns the bets a strategy places once its trigger fires."""
+        template = self.get_bet_template(strategy_type, config)
+        return list(template.bets) if template is not None else []
+
+    def execute_strategy(self, strategy_type, history, config):
+        """Executes any registered strategy type against the history (most recent first)."""
+        strategy = compile_strategy(strategy_type, config)
+        return strategy.evaluate(history) if strategy is not None else []
 
     def execute_strategy_terminal_8(self, history, config):
         """Executes Strategy 1: Buscar Terminal (8) pelo padrão 1→6.
         history: list of numbers that came out in the roulette (most recent first)
         config: dictionary with strategy configuration (e.g., chip_value, max_entries)
         """
-        bets = []
-        trigger_found = False
-
-        # Gatilhos válidos (4 formas):
-        # 1. Consecutivo: 1 → 6 → 8
-        # 2. Intervalo 1 casa: 1 [x] 6 [x] 8
-        # 3. Intervalo 2 casas: 1 [xx] 6 [xx] 8
-        # 4. Intervalo 3 casas: 1 [xxx] 6 [xxx] 8
-
-        # Simplified check for 1 -> 6 -> 8 consecutive for now
-        if self._check_pattern(history, [1, 6, 8]):
-            trigger_found = True
-
-        if trigger_found:
-            # Apostas:
-            # 1 ficha em: 12, 28, 7, 29, 18, 22, 8, 11, 14
-            # 2 fichas no: 30
-            chip_value = config.get("chip_value", 1.0)
-            bets.append({"number": 12, "amount": chip_value})
-            bets.append({"number": 28, "amount": chip_value})
-            bets.append({"number": 7, "amount": chip_value})
-            bets.append({"number": 29, "amount": chip_value})
-            bets.append({"number": 18, "amount": chip_value})
-            bets.append({"number": 22, "amount": chip_value})
-            bets.append({"number": 8, "amount": chip_value})
-            bets.append({"number": 11, "amount": chip_value})
-            bets.append({"number": 14, "amount": chip_value})
-            bets.append({"number": 30, "amount": chip_value * 2})
-
-        return bets
+        return self.execute_strategy("terminal_8", history, config)
 
     def execute_strategy_3x3_pattern(self, history, config):
         """Executes Strategy 2: Padrão 3x3.
         history: list of numbers that came out in the roulette (most recent first)
         config: dictionary with strategy configuration
         """
-        bets = []
-        trigger_found = False
-        
-        list_numbers = [0, 3, 4, 12, 15, 19, 21, 26, 28, 32, 35]
-
-        # Gatilho: Se 3 números consecutivos da lista saírem
-        if len(history) >= 3:
-            consecutive_in_list = 0
-            for i in range(3):
-                if history[i] in list_numbers:
-                    consecutive_in_list += 1
-                else:
-                    consecutive_in_list = 0 # Reset if not consecutive
-                    break
-            if consecutive_in_list == 3:
-                trigger_found = True
-
-        if trigger_found:
-            # Apostas:
-            # 1 ficha em cada número da lista.
-            # 2 fichas no 0.
-            chip_value = config.get("chip_value", 1.0)
-            for num in list_numbers:
-                if num == 0:
-                    bets.append({"number": num, "amount": chip_value * 2})
-                else:
-                    bets.append({"number": num, "amount": chip_value})
-
-        return bets
+        return self.execute_strategy("3x3_pattern", history, config)
 
     def execute_strategy_2x7_pattern(self, history, config):
         """Executes Strategy 3: Padrão 2x7.
         history: list of numbers that came out in the roulette (most recent first)
         config: dictionary with strategy configuration
         """
-        bets = []
-        trigger_found = False
-
-        list_numbers = [2, 4, 7, 12, 17, 18, 19, 21, 22, 25, 28, 29, 34, 35]
-
-        # Gatilho: Se 3 números consecutivos da lista saírem
-        if len(history) >= 3:
-            consecutive_in_list = 0
-            for i in range(3):
-                if history[i] in list_numbers:
-                    consecutive_in_list += 1
-                else:
-                    consecutive_in_list = 0 # Reset if not consecutive
-                    break
-            if consecutive_in_list == 3:
-                trigger_found = True
-
-        if trigger_found:
-            # Apostas:
-            # 1 ficha em cada número da lista.
-            chip_value = config.get("chip_value", 1.0)
-            for num in list_numbers:
-                bets.append({"number": num, "amount": chip_value})
-
-        return bets
+        return self.execute_strategy("2x7_pattern", history, config)
 
 
 # Example Usage (for testing)
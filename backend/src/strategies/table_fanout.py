@@ -0,0 +1,200 @@
+from collections import deque
+from threading import Lock
+from src.strategies.registry import get_compiled_strategy
+
+# Spins kept per table; covers the longest trigger window (1 [xxx] 6 [xxx] 8)
+TABLE_HISTORY_SIZE = 20
+
+
+class Subscription:
+    """Snapshot of an active strategy subscribed to a table.
+
+    Holds plain values only, so it stays usable outside the request session
+    that loaded the Strategy row.
+    """
+
+    __slots__ = ("strategy_id", "user_id", "compiled", "tables",
+                 "schedule_enabled", "start_time", "end_time", "days_of_week")
+
+    def __init__(self, strategy, compiled):
+        self.strategy_id = strategy.id
+        self.user_id = strategy.user_id
+        self.compiled = compiled
+        tables = compiled.config.get("tables") or []
+        self.tables = frozenset(str(table) for table in tables) or None  # None = every table
+        self.schedule_enabled = strategy.schedule_enabled
+        self.start_time = strategy.start_time
+        self.end_time = strategy.end_time
+        self.days_of_week = strategy.get_days_of_week()
+
+    def watches(self, table_id):
+        return self.tables is None or str(table_id) in self.tables
+
+    def is_active_now(self, now=None):
+        from src.models.strategy import is_within_schedule
+        try:
+            return is_within_schedule(self.schedule_enabled, self.start_time, self.end_time, self.days_of_week, now)
+        except Exception:
+            return True
+
+
+class TableSubscriptionIndex:
+    """In-memory index of active strategies by (betting_house, table).
+
+    The index is rebuilt only when the set of active strategies changes,
+    detected with a single COUNT/MAX(updated_at) query, so a spin costs one
+    cheap query instead of a user lookup and strategy load per user.
+    """
+
+    def __init__(self):
+        self._signature = None
+        self._by_house = {}
+        self._by_table = {}
+        self._lock = Lock()
+
+    def _load_signature(self):
+        from sqlalchemy import func
+        from src.models.strategy import Strategy
+        return Strategy.query.with_entities(
+            func.count(Strategy.id), func.max(Strategy.updated_at)
+        ).filter(Strategy.is_active == True).one()
+
+    def refresh(self, force=False):
+        """Rebuilds the index if active strategies were added, changed or removed."""
+        signature = tuple(self._load_signature())
+        if not force and signature == self._signature:
+            return
+
+        from src.models.strategy import Strategy
+        by_house = {}
+        for strategy in Strategy.query.filter_by(is_active=True).all():
+            compiled = get_compiled_strategy(strategy)
+            if compiled is None:
+                continue
+            subscription = Subscription(strategy, compiled)
+            for house in compiled.betting_houses:
+                by_house.setdefault(house, []).append(subscription)
+
+        with self._lock:
+            self._by_house = by_house
+            self._by_table = {}
+            self._signature = signature
+
+    def subscribers(self, betting_house, table_id):
+        """Returns the subscriptions watching a table (schedule not yet applied)."""
+        key = (betting_house, str(table_id))
+        subscriptions = self._by_table.get(key)
+        if subscriptions is None:
+            subscriptions = [
+                subscription for subscription in self._by_house.get(betting_house, [])
+                if subscription.watches(table_id)
+            ]
+            with self._lock:
+                self._by_table[key] = subscriptions
+        return subscriptions
+
+
+def history_key(betting_house, table_id=None, user_id=None):
+    """Key of a spin stream: the spins a user reports (whatever their table),
+    or the spins received once per table of a betting house."""
+    if user_id is not None:
+        return (betting_house, None, int(user_id))
+    return (betting_house, str(table_id))
+
+
+class TableHistory:
+    """Ring buffer of the most recent spins per stream (see history_key).
+
+    Serves strategy history without database reads. The buffers live in
+    the process, so they are rehydrated from the Spin table on startup;
+    with several app processes a table's spins should reach one process.
+    """
+
+    def __init__(self, size=TABLE_HISTORY_SIZE):
+        self.size = size
+        self._tables = {}
+        self._versions = {}
+        self._lock = Lock()
+
+    def preview(self, betting_house, table_id, number, user_id=None, market_version=None):
+        """Returns the stream history as a list (most recent first) as it will be once the spin
+        is recorded, without recording it: the spin is recorded after it is committed.
+        Returns None if `market_version` repeats the latest recorded one (duplicate delivery).
+        """
+        key = history_key(betting_house, table_id, user_id)
+        with self._lock:
+            if market_version is not None and self._versions.get(key) == market_version:
+                return None
+            history = self._tables.get(key)
+            return [number] + (list(history)[:self.size - 1] if history is not None else [])
+
+    def record(self, betting_house, table_id, number, user_id=None, market_version=None):
+        """Adds a spin and returns the stream history as a list (most recent first).
+        Returns None if `market_version` repeats the latest recorded one (duplicate delivery).
+        """
+        key = history_key(betting_house, table_id, user_id)
+        with self._lock:
+            if market_version is not None:
+                if self._versions.get(key) == market_version:
+                    return None
+                self._versions[key] = market_version
+            history = self._tables.get(key)
+            if history is None:
+                history = self._tables[key] = deque(maxlen=self.size)
+            history.appendleft(number)
+            return list(history)
+
+    def get(self, betting_house, table_id=None, user_id=None):
+        """Returns the stream history as a list (most recent first)."""
+        history = self._tables.get(history_key(betting_house, table_id, user_id))
+        return list(history) if history is not None else []
+
+    def rehydrate(self):
+        """Reloads the last `size` spins of every stream from the Spin table."""
+        from src.models.spin import Spin
+
+        tables = {}
+        versions = {}
+        streams = Spin.query.with_entities(Spin.betting_house, Spin.table_id, Spin.user_id).filter(
+            (Spin.table_id != None) | (Spin.user_id != None)
+        ).distinct().all()
+        seen = set()
+        for betting_house, table_id, user_id in streams:
+            key = history_key(betting_house, table_id, user_id)
+            if key in seen:
+                continue
+            seen.add(key)
+            if user_id is not None:
+                query = Spin.query.filter_by(betting_house=betting_house, user_id=user_id)
+            else:
+                query = Spin.query.filter_by(betting_house=betting_house, table_id=table_id, user_id=None)
+            rows = query.order_by(Spin.spun_at.desc(), Spin.id.desc()).limit(self.size).all()
+            tables[key] = deque((row.number for row in rows), maxlen=self.size)
+            if rows and rows[0].market_version is not None:
+                versions[key] = rows[0].market_version
+
+        with self._lock:
+            self._tables = tables
+            self._versions = versions
+        return len(tables)
+
+
+def evaluate_table_spin(subscriptions, history, now=None):
+    """Evaluates every subscribed strategy against one shared history window.
+
+    Strategies sharing a trigger key are matched once per spin however many
+    users subscribe to them. Returns a list of
+    (subscription, bets) for the strategies that triggered.
+    """
+    fired = {}
+    triggered = []
+    for subscription in subscriptions:
+        if not subscription.is_active_now(now):
+            continue
+        compiled = subscription.compiled
+        trigger_key = compiled.trigger_key
+        if trigger_key not in fired:
+            fired[trigger_key] = compiled.trigger.matches(history)
+        if fired[trigger_key]:
+            triggered.append((subscription, list(compiled.template.bets)))
+    return triggered
@@ -0,0 +1,146 @@
+import numpy as np
+from src.strategies.numset import NumSet, WHEEL, WHEEL_SIZE
+
+
+class SequenceTrigger:
+    """Incremental matcher for a sequence of numbers with fixed intervals.
+
+    Detects `pattern` (in chronological order) where consecutive pattern
+    numbers are separated by exactly `gap` other numbers, for every gap in
+    `gaps`. E.g. pattern (1, 6, 8) with gaps (0, 1) matches 1 → 6 → 8 and
+    1 [x] 6 [x] 8.
+
+    Each gap is tracked by `gap + 1` interleaved lanes holding the length of
+    the pattern prefix matched so far, so `feed` costs O(len(gaps)) per spin
+    regardless of how long the history is. Pattern numbers must be distinct.
+    """
+
+    def __init__(self, pattern, gaps=(0,)):
+        if len(set(pattern)) != len(pattern):
+            raise ValueError("Pattern numbers must be distinct")
+        self.pattern = tuple(pattern)
+        self.gaps = tuple(gaps)
+        self.window = max((gap + 1) * (len(self.pattern) - 1) + 1 for gap in self.gaps)
+        self.reset()
+
+    def reset(self):
+        """Forgets every spin fed so far."""
+        self._lanes = [[0] * (gap + 1) for gap in self.gaps]
+        self._spins = 0
+
+    def feed(self, number):
+        """Consumes the latest spin and returns True if the pattern completes on it."""
+        pattern = self.pattern
+        first = pattern[0]
+        last_state = len(pattern) - 1
+        triggered = False
+
+        for lane in self._lanes:
+            phase = self._spins % len(lane)
+            state = lane[phase]
+            if number == pattern[state]:
+                if state == last_state:
+                    triggered = True
+                    state = 0
+                else:
+                    state += 1
+            else:
+                # Distinct numbers: on a mismatch only the first one can restart the prefix
+                state = 1 if number == first else 0
+            lane[phase] = state
+
+        self._spins += 1
+        return triggered
+
+    def matches(self, history):
+        """Checks whether the pattern completes on the most recent spin.
+        history: list of numbers (most recent first)
+        """
+        size = len(self.pattern)
+        for gap in self.gaps:
+            stride = gap + 1
+            if len(history) < stride * (size - 1) + 1:
+                continue
+            if all(history[i * stride] == self.pattern[size - 1 - i] for i in range(size)):
+                return True
+        return False
+
+    def symbol_classes(self):
+        """Partition of the wheel into numbers the trigger cannot tell apart."""
+        return [NumSet([number]) for number in self.pattern] + [WHEEL - NumSet(self.pattern)]
+
+    def scan(self, spins):
+        """Vectorized trigger detection over an array of spins (chronological order
+        along the last axis, so a 2-D array holds one independent stream per row).
+        Returns a boolean array, True where the pattern completes on that spin.
+        """
+        spins = np.asarray(spins)
+        size = len(self.pattern)
+        length = spins.shape[-1]
+        fired = np.zeros(spins.shape, dtype=bool)
+        for gap in self.gaps:
+            stride = gap + 1
+            span = stride * (size - 1)
+            if length <= span:
+                continue
+            count = length - span
+            matched = spins[..., :count] == self.pattern[0]
+            for i in range(1, size):
+                matched &= spins[..., i * stride:i * stride + count] == self.pattern[i]
+            fired[..., span:] |= matched
+        return fired
+
+
+class RunTrigger:
+    """Incremental matcher for `length` consecutive spins drawn from `numbers`."""
+
+    def __init__(self, numbers, length=3):
+        self.numbers = numbers if isinstance(numbers, NumSet) else NumSet(numbers)
+        self._mask = self.numbers.mask
+        self.length = length
+        self.window = length
+        self.reset()
+
+    def reset(self):
+        """Forgets every spin fed so far."""
+        self._run = 0
+
+    def feed(self, number):
+        """Consumes the latest spin and returns True if the last `length` spins are in the set."""
+        if (self._mask >> number) & 1:
+            self._run += 1
+        else:
+            self._run = 0
+        return self._run >= self.length
+
+    def matches(self, history):
+        """Checks whether the last `length` spins are in the set.
+        history: list of numbers (most recent first)
+        """
+        if len(history) < self.length:
+            return False
+        mask = self._mask
+        return all((mask >> number) & 1 for number in history[:self.length])
+
+    def symbol_classes(self):
+        """Partition of the wheel into numbers the trigger cannot tell apart."""
+        return [numbers for numbers in (self.numbers, WHEEL - self.numbers) if numbers]
+
+    def scan(self, spins):
+        """Vectorized trigger detection over an array of spins (chronological order
+        along the last axis, so a 2-D array holds one independent stream per row).
+        Returns a boolean array, True where the last `length` spins are in the set.
+        """
+        spins = np.asarray(spins)
+        lookup = np.zeros(WHEEL_SIZE + 1, dtype=bool)  # +1: 00 on American wheels
+        lookup[list(self.numbers)] = True
+        in_set = lookup[spins]
+        fired = np.zeros(spins.shape, dtype=bool)
+        if spins.shape[-1] < self.length:
+            return fired
+        count = spins.shape[-1] - self.length + 1
+        matched = in_set[..., :count].copy()
+        for i in range(1, self.length):
+            matched &= in_set[..., i:i + count]
+        fired[..., self.length - 1:] = matched
+        return fired
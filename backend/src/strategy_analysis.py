@@ -0,0 +1,180 @@
+import numpy as np
+from src.models.bet import STRAIGHT_UP_PAYOUT
+from src.strategies.numset import WHEEL_SIZE
+from src.strategies.strategy_logic import compile_strategy
+
+# Largest Markov chain built before giving up (states = classes ** window, plus the
+# windows reachable with entries left after a trigger)
+MAX_STATES = 1 << 20
+
+
+def analyze_strategy(strategy_type, config, probabilities=None, payout=STRAIGHT_UP_PAYOUT):
+    """Exact long-run statistics of a strategy on an independent-spin wheel.
+
+    Triggers only look at the last `window` spins, and only at which of a few
+    number classes each spin falls in, so the chain over those class windows
+    (plus the count of entries left after the latest trigger) is finite. Its
+    stationary distribution gives the trigger and entry rates, and the
+    covariance of profits `k` spins apart (zero beyond the window and the
+    entries) gives the long-run variance. No spins are simulated.
+
+    probabilities: optional per-number probabilities (uniform 0-36 by default)
+    payout: profit per unit staked on the winning number (35, as bets are settled)
+    Returns a dict with trigger rate, EV and variance per spin and per entry
+    (the `*_per_trigger` values refer to one spin bet on).
+    """
+    strategy = compile_strategy(strategy_type, config)
+    if strategy is None:
+        raise ValueError(f"Unknown strategy type: {strategy_type}")
+
+    if probabilities is None:
+        probabilities = np.full(WHEEL_SIZE, 1.0 / WHEEL_SIZE)
+    else:
+        probabilities = np.asarray(probabilities, dtype=float)
+        if probabilities.shape != (WHEEL_SIZE,) or (probabilities < 0).any() or probabilities.sum() <= 0:
+            raise ValueError("probabilities must hold one non-negative weight per number 0-36")
+        probabilities = probabilities / probabilities.sum()
+
+    trigger = strategy.create_trigger()
+    template = strategy.template
+    max_entries = strategy.max_entries
+    classes = trigger.symbol_classes()
+    class_count = len(classes)
+    window = trigger.window
+    window_count = class_count ** window
+    if window_count > MAX_STATES:
+        raise ValueError(f"Trigger needs {window_count} states (limit {MAX_STATES})")
+
+    # Profit of one spin bet on by outcome: the winning stake pays `payout`, the others are lost
+    stakes = np.asarray(template.stakes)
+    profits = stakes * payout - (template.total_stake - stakes)
+    ev_per_trigger = float(probabilities @ profits)
+    second_moment = float(probabilities @ profits ** 2)
+
+    # Outcome kinds: the trigger class of a spin and whether the bets cover it
+    kind_class, kind_hit, kind_probability, kind_profit = [], [], [], []
+    for index, numbers in enumerate(classes):
+        for hit, part in ((True, numbers & template.coverage), (False, numbers - template.coverage)):
+            if part:
+                members = list(part)
+                kind_class.append(index)
+                kind_hit.append(hit)
+                kind_probability.append(probabilities[members].sum())
+                kind_profit.append(probabilities[members] @ profits[members])
+    kind_class = np.array(kind_class)
+    kind_hit = np.array(kind_hit)
+    kind_probability = np.array(kind_probability)
+    kind_profit = np.array(kind_profit)
+    representatives = np.array([next(iter(numbers)) for numbers in classes], dtype=np.int8)
+    class_probabilities = np.bincount(kind_class, weights=kind_probability, minlength=class_count)
+
+    # Window = classes of the last `window` spins, oldest spin as the most significant digit
+    windows = np.arange(window_count)
+    digits = (windows[:, None] // class_count ** np.arange(window - 1, -1, -1)) % class_count
+    fired = trigger.scan(representatives[digits].ravel())[window - 1::window]
+
+    # State = (window, entries left); a bet is placed on the next spin if entries left > 0.
+    # A trigger sets max_entries and every spin it misses takes one off, so only the
+    # windows reachable that way get states with entries left, not all of them
+    next_windows = ((windows * class_count) % window_count)[:, None] + kind_class
+    level_windows = {0: windows, max_entries: windows[fired]}
+    for entries_left in range(max_entries - 1, 0, -1):
+        reached = next_windows[level_windows[entries_left + 1]][:, ~kind_hit].ravel()
+        level_windows[entries_left] = np.unique(reached[~fired[reached]])
+    levels = range(max_entries + 1)
+    offsets = np.cumsum([0] + [len(level_windows[level]) for level in levels])
+    state_count = int(offsets[-1])
+    if state_count > MAX_STATES:
+        raise ValueError(f"Trigger needs {state_count} states (limit {MAX_STATES})")
+
+    def state_index(state_windows, entries_left):
+        # Level windows are sorted, so a window's position is found by binary search
+        return offsets[entries_left] + np.searchsorted(level_windows[entries_left], state_windows)
+
+    state_windows = np.concatenate([level_windows[level] for level in levels])
+    state_entries = np.repeat(np.arange(max_entries + 1), np.diff(offsets))
+    targets = next_windows[state_windows]
+    target_entries = np.where(
+        fired[targets], max_entries,
+        np.where((state_entries[:, None] > 0) & ~kind_hit, state_entries[:, None] - 1, 0)
+    )
+    successors = np.empty_like(targets)
+    for level in levels:
+        selected = target_entries == level
+        successors[selected] = state_index(targets[selected], level)
+    betting = state_entries > 0
+
+    def step(weights):
+        # Pushes a measure over states one spin forward
+        return np.bincount(successors.ravel(), weights=(weights[:, None] * kind_probability).ravel(),
+                           minlength=state_count)
+
+    # Windows are stationary from the start; entries left settle after max_entries spins
+    stationary = np.zeros(state_count)
+    stationary[state_index(windows, 0)] = np.prod(class_probabilities[digits], axis=1)
+    for _ in range(max_entries):
+        stationary = step(stationary)
+
+    trigger_rate = float(stationary @ fired[state_windows])
+    entry_rate = float(stationary @ betting)
+    ev_per_spin = entry_rate * ev_per_trigger
+    variance_per_spin = entry_rate * second_moment - ev_per_spin ** 2
+
+    # Cov(profit at spin 1, profit at spin 1 + k) for k = 1..window + max_entries - 1; zero beyond that
+    weighted = np.bincount(
+        successors.ravel(),
+        weights=((stationary * betting)[:, None] * kind_profit).ravel(),
+        minlength=state_count
+    )
+    expected_profit = betting * ev_per_trigger
+    covariance_sum = 0.0
+    for _ in range(window + max_entries - 1):
+        covariance_sum += float(weighted @ expected_profit) - ev_per_spin ** 2
+        weighted = step(weighted)
+
+    long_run_variance = variance_per_spin + 2 * covariance_sum
+
+    return {
+        "strategy_type": strategy_type,
+        "config": config,
+        "trigger_rate": trigger_rate,
+        "spins_per_trigger": 1 / trigger_rate if trigger_rate > 0 else None,
+        "max_entries": max_entries,
+        "entry_rate": entry_rate,
+        "entries_per_trigger": entry_rate / trigger_rate if trigger_rate > 0 else 0,
+        "bets_per_trigger": len(template.bets),
+        "stake_per_trigger": template.total_stake,
+        "win_probability": float(probabilities[stakes > 0].sum()),
+        "win_rate": float(probabilities[stakes > 0].sum()) / len(template.bets) * 100 if template.bets else 0,
+        "ev_per_trigger": ev_per_trigger,
+        "variance_per_trigger": second_moment - ev_per_trigger ** 2,
+        "ev_per_spin": ev_per_spin,
+        "variance_per_spin": variance_per_spin,
+        "long_run_variance_per_spin": long_run_variance,
+        "ev_per_unit_staked": ev_per_trigger / template.total_stake if template.total_stake else 0,
+        "markov_states": state_count
+    }
+
+# Example Usage (for testing)
+if __name__ == "__main__":
+    import time
+    from src.vectorized_simulation import VectorizedSimulation
+
+    config = {"chip_value": 1.0, "max_entries": 2}
+    num_spins = 10_000_000
+    for strategy_type in ["terminal_8", "3x3_pattern", "2x7_pattern"]:
+        start = time.perf_counter()
+        analysis = analyze_strategy(strategy_type, config)
+        # RouletteSimulator pays 36 per unit on a hit; the cross-check uses its payout
+        simulated = analyze_strategy(strategy_type, config, payout=36)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{strategy_type} ({analysis['markov_states']} states, {elapsed:.1f} ms):")
+        print(f"  Trigger rate: {analysis['trigger_rate']:.6f}")
+        print(f"  EV per spin: {analysis['ev_per_spin']:.6f}")
+        print(f"  Long-run variance per spin: {analysis['long_run_variance_per_spin']:.4f}")
+
+        # Cross-check against a Monte Carlo run
+        result = VectorizedSimulation(seed=1).run_simulation(strategy_type, config, num_spins)
+        expected_std = (simulated["long_run_variance_per_spin"] * num_spins) ** 0.5
+        print(f"  Simulated profit: {result['total_profit']:.2f} "
+              f"(expected {simulated['ev_per_spin'] * num_spins:.2f} ± {expected_std:.2f})")
@@ -0,0 +1,361 @@
+import math
+from collections import deque
+import numpy as np
+from src.roulette_simulator import EUROPEAN_WHEEL, WheelModel
+from src.strategies.strategy_logic import compile_strategy
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def generate_spins(rng, size, wheel=None):
+    """Draws `size` spins at once as an int8 array (European wheel by default)."""
+    return (wheel or EUROPEAN_WHEEL).sample(rng, size)
+
+
+def settle_bets(betting, spins, stakes, total_stake):
+    """Settles a template placed on every spin where `betting` is True.
+    Returns (bet positions, profit per position) using the straight-up payout
+    of RouletteSimulator.calculate_payout (36x on the covered number).
+    """
+    positions = np.flatnonzero(betting)
+    stake_on_winner = stakes[spins[positions]]
+    profits = stake_on_winner * 36 - (total_stake - stake_on_winner)
+    return positions, profits
+
+
+def entry_mask(starts, hits, max_entries, last_start=None, last_hit=None):
+    """Spins bet on when every trigger is followed by up to `max_entries` entries.
+
+    starts: True on the first spin after a trigger
+    hits: True where the spin is covered by the bet template
+    last_start, last_hit: carry from the previous array (see below)
+    A spin is bet on if the latest first entry is less than `max_entries`
+    spins back and no covered spin came out since. 2-D arrays are handled
+    row by row (one stream per row). Returns (betting, last_start, last_hit),
+    the latter two being the indices of the latest first entry and hit
+    relative to the end of the array, to pass along with the next array of
+    the stream.
+    """
+    expired = -max_entries - 1
+    last_start = expired if last_start is None else last_start
+    last_hit = expired if last_hit is None else last_hit
+    count = starts.shape[-1]
+    if not count:
+        return np.zeros(starts.shape, dtype=bool), last_start, last_hit
+
+    index = np.arange(count)
+    latest_start = np.maximum.accumulate(np.where(starts, index, np.expand_dims(last_start, -1)), axis=-1)
+    latest_hit = np.maximum.accumulate(np.where(hits, index, np.expand_dims(last_hit, -1)), axis=-1)
+    hit_before = np.concatenate(
+        (np.broadcast_to(np.expand_dims(last_hit, -1), latest_hit.shape[:-1] + (1,)), latest_hit[..., :-1]),
+        axis=-1
+    )
+    betting = (index - latest_start < max_entries) & (hit_before < latest_start)
+    return (betting,
+            np.maximum(latest_start[..., -1] - count, expired),
+            np.maximum(latest_hit[..., -1] - count, expired))
+
+
+class SimulationStats:
+    """Mergeable accumulator for simulation results.
+
+    Keeps counts, the sum and sum of squares of the profit per triggered spin,
+    the running peak/trough of cumulative profit and the losing runs at both
+    ends, which is enough to merge consecutive shards exactly (including max
+    drawdown and the longest losing streak) without keeping their bets.
+    """
+
+    __slots__ = ("spins", "triggers", "total_bets", "winning_bets",
+                 "profit", "profit_sq", "peak", "trough", "max_drawdown",
+                 "leading_losses", "trailing_losses", "longest_losing_streak")
+
+    def __init__(self):
+        self.spins = 0
+        self.triggers = 0
+        self.total_bets = 0
+        self.winning_bets = 0
+        self.profit = 0.0
+        self.profit_sq = 0.0
+        self.peak = 0.0        # Highest cumulative profit (relative to the start)
+        self.trough = 0.0      # Lowest cumulative profit (relative to the start)
+        self.max_drawdown = 0.0
+        self.leading_losses = 0    # Lost triggers before the first win
+        self.trailing_losses = 0   # Lost triggers since the last win (current streak)
+        self.longest_losing_streak = 0
+
+    def add(self, profits, bets_per_trigger, total_stake):
+        """Accumulates the profits of consecutive triggered spins."""
+        if not len(profits):
+            return
+        self._add_streaks(profits > -total_stake)
+        cumulative = self.profit + np.cumsum(profits)
+        running_peak = np.maximum.accumulate(np.concatenate(([self.peak], cumulative)))[1:]
+        self.max_drawdown = max(self.max_drawdown, float(np.max(running_peak - cumulative)))
+        self.peak = max(self.peak, float(running_peak[-1]))
+        self.trough = min(self.trough, float(np.min(cumulative)))
+        self.triggers += len(profits)
+        self.total_bets += len(profits) * bets_per_trigger
+        self.winning_bets += int(np.count_nonzero(profits > -total_stake))
+        self.profit = float(cumulative[-1])
+        self.profit_sq += float(np.dot(profits, profits))
+
+    def _add_streaks(self, won):
+        wins = np.flatnonzero(won)
+        count = len(won)
+        all_lost_so_far = self.leading_losses == self.triggers
+        if not len(wins):
+            self.trailing_losses += count
+            self.longest_losing_streak = max(self.longest_losing_streak, self.trailing_losses)
+            if all_lost_so_far:
+                self.leading_losses += count
+            return
+
+        first, last = int(wins[0]), int(wins[-1])
+        inner = int(np.max(np.diff(wins))) - 1 if len(wins) > 1 else 0
+        self.longest_losing_streak = max(self.longest_losing_streak, self.trailing_losses + first,
+                                         inner, count - last - 1)
+        if all_lost_so_far:
+            self.leading_losses += first
+        self.trailing_losses = count - last - 1
+
+    def merge(self, other):
+        """Appends the results of the shard that ran right after this one."""
+        merged = SimulationStats()
+        merged.spins = self.spins + other.spins
+        merged.triggers = self.triggers + other.triggers
+        merged.total_bets = self.total_bets + other.total_bets
+        merged.winning_bets = self.winning_bets + other.winning_bets
+        merged.profit = self.profit + other.profit
+        merged.profit_sq = self.profit_sq + other.profit_sq
+        merged.peak = max(self.peak, self.profit + other.peak)
+        merged.trough = min(self.trough, self.profit + other.trough)
+        merged.max_drawdown = max(self.max_drawdown, other.max_drawdown,
+                                  self.peak - (self.profit + other.trough))
+        merged.leading_losses = (self.leading_losses if self.leading_losses < self.triggers
+                                 else self.triggers + other.leading_losses)
+        merged.trailing_losses = (other.trailing_losses if other.trailing_losses < other.triggers
+                                  else other.triggers + self.trailing_losses)
+        merged.longest_losing_streak = max(self.longest_losing_streak, other.longest_losing_streak,
+                                           self.trailing_losses + other.leading_losses)
+        return merged
+
+    def scaled(self, factor):
+        """Stats of the same bets with every stake multiplied by `factor` (>= 0)."""
+        scaled = SimulationStats()
+        for name in self.__slots__:
+            setattr(scaled, name, getattr(self, name))
+        scaled.profit *= factor
+        scaled.profit_sq *= factor * factor
+        scaled.peak *= factor
+        scaled.trough *= factor
+        scaled.max_drawdown *= factor
+        return scaled
+
+    def to_dict(self):
+        mean = self.profit / self.triggers if self.triggers else 0
+        variance = self.profit_sq / self.triggers - mean * mean if self.triggers else 0
+        return {
+            "num_spins": self.spins,
+            "triggers": self.triggers,
+            "total_profit": self.profit,
+            "total_bets": self.total_bets,
+            "winning_bets": self.winning_bets,
+            "losing_bets": self.total_bets - self.winning_bets,
+            "win_rate": (self.winning_bets / self.total_bets * 100) if self.total_bets > 0 else 0,
+            "avg_profit_per_bet": self.profit / self.total_bets if self.total_bets > 0 else 0,
+            "avg_profit_per_trigger": mean,
+            "std_profit_per_trigger": math.sqrt(max(variance, 0.0)),
+            "max_drawdown": self.max_drawdown,
+            "longest_losing_streak": self.longest_losing_streak,
+            "current_losing_streak": self.trailing_losses
+        }
+
+
+class ChunkSettler:
+    """Settles one strategy over consecutive chunks of a spin stream.
+    Carries the last `window` spins so triggers spanning chunks are found.
+    """
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.trigger = strategy.create_trigger()
+        self.template = strategy.template
+        # Extra zero stake so pockets such as 00 (index 37) simply lose
+        self.stakes = np.append(self.template.stakes, 0.0)
+        self.max_entries = strategy.max_entries
+        self._tail = np.empty(0, dtype=np.int8)
+        self._last_start = None
+        self._last_hit = None
+
+    def settle(self, chunk):
+        """Returns (positions, profits) of the bets settled on `chunk`."""
+        tail = self._tail
+        combined = np.concatenate((tail, chunk))
+        fired = self.trigger.scan(combined)
+        # Bets generated by a trigger are placed on the following spin
+        if len(tail):
+            betting = fired[len(tail) - 1:-1]
+        else:
+            betting = np.concatenate(([False], fired[:-1]))
+        if self.max_entries > 1:
+            betting, self._last_start, self._last_hit = entry_mask(
+                betting, self.stakes[chunk] > 0, self.max_entries, self._last_start, self._last_hit)
+
+        self._tail = combined[-self.trigger.window:]
+        return settle_bets(betting, chunk, self.stakes, self.template.total_stake)
+
+
+def iter_settlements(strategy, chunks):
+    """Yields (offset, chunk, positions, profits) for each chunk of spins,
+    where positions index the spins of the chunk on which bets were settled.
+    """
+    settler = ChunkSettler(strategy)
+    offset = 0
+    for chunk in chunks:
+        positions, profits = settler.settle(chunk)
+        yield offset, chunk, positions, profits
+        offset += len(chunk)
+
+
+class VectorizedSimulation:
+    """NumPy engine equivalent to StrategySimulation.run_simulation.
+
+    Spins are drawn in chunks from a numpy Generator, triggers are found with
+    sliding-window masks and payouts are looked up from the bet template's
+    stakes array, so no Python code runs per spin.
+    """
+
+    def __init__(self, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, numbers=None, wheel=None):
+        self.rng = np.random.default_rng(seed)
+        self.chunk_size = chunk_size
+        if wheel is None and numbers is not None:
+            wheel = WheelModel("custom", numbers)
+        self.wheel = wheel or EUROPEAN_WHEEL
+
+    def _spin_chunks(self, num_spins):
+        done = 0
+        while done < num_spins:
+            size = min(self.chunk_size, num_spins - done)
+            yield generate_spins(self.rng, size, self.wheel)
+            done += size
+
+    def stream_simulation(self, strategy_type, config, num_spins=1000, spins=None, last_k=50):
+        """Runs a simulation chunk by chunk, yielding a summary after each chunk.
+
+        Memory stays constant whatever `num_spins` is: only running aggregates
+        (SimulationStats) and a ring buffer of the last `last_k` settled bets
+        are kept. Each summary holds the chunk totals, the running statistics
+        and the ring buffer contents.
+        spins: optional array of outcomes to replay instead of drawing new ones
+        """
+        strategy = compile_strategy(strategy_type, config)
+        if spins is not None:
+            spins = np.asarray(spins, dtype=np.int8)
+            num_spins = len(spins)
+            chunks = (spins[start:start + self.chunk_size] for start in range(0, num_spins, self.chunk_size))
+        else:
+            chunks = self._spin_chunks(num_spins)
+
+        stats = SimulationStats()
+        last_bets = deque(maxlen=last_k)
+
+        if strategy is None:
+            stats.spins = num_spins
+            yield self._summary(strategy_type, config, num_spins, stats, last_bets, 0, 0, 0.0)
+            return
+
+        template = strategy.template
+        bets_per_trigger = len(template.bets)
+        chunk = ()
+        for offset, chunk, positions, profits in iter_settlements(strategy, chunks):
+            profit_before = stats.profit
+            stats.add(profits, bets_per_trigger, template.total_stake)
+            stats.spins += len(chunk)
+
+            if len(positions) and last_k:
+                cumulative = profit_before + np.cumsum(profits)
+                for i in range(max(0, len(positions) - last_k), len(positions)):
+                    last_bets.append({
+                        "spin": offset + int(positions[i]) + 1,
+                        "winning_number": int(chunk[positions[i]]),
+                        "bets": template.bets,
+                        "profit": float(profits[i]),
+                        "cumulative_profit": float(cumulative[i])
+                    })
+
+            yield self._summary(strategy_type, config, num_spins, stats, last_bets,
+                                len(chunk), len(positions), stats.profit - profit_before)
+
+        if not len(chunk):
+            # No spins at all: still report an (empty) summary
+            yield self._summary(strategy_type, config, num_spins, stats, last_bets, 0, 0, 0.0)
+
+    def _summary(self, strategy_type, config, num_spins, stats, last_bets, chunk_spins, chunk_triggers, chunk_profit):
+        summary = stats.to_dict()
+        summary.update({
+            "strategy_type": strategy_type,
+            "config": config,
+            "num_spins": num_spins,
+            "spins_done": stats.spins,
+            "chunk_spins": chunk_spins,
+            "chunk_triggers": chunk_triggers,
+            "chunk_profit": chunk_profit,
+            "last_bets": [dict(bet, bets=list(bet["bets"])) for bet in last_bets]
+        })
+        return summary
+
+    def run_simulation(self, strategy_type, config, num_spins=1000, spins=None):
+        """Runs a simulation for a given strategy over a specified number of spins.
+        spins: optional array of outcomes to replay instead of drawing new ones
+        """
+        summary = None
+        for summary in self.stream_simulation(strategy_type, config, num_spins, spins):
+            pass
+
+        return {
+            "strategy_type": strategy_type,
+            "config": config,
+            "num_spins": summary["num_spins"],
+            "total_profit": summary["total_profit"],
+            "total_bets": summary["total_bets"],
+            "winning_bets": summary["winning_bets"],
+            "losing_bets": summary["losing_bets"],
+            "win_rate": summary["win_rate"],
+            "avg_profit_per_bet": summary["avg_profit_per_bet"],
+            "bet_history": summary["last_bets"]  # Keep last 50 for analysis
+        }
+
+    def compare_strategies(self, num_spins=1000):
+        """Compares all three strategies over the same number of spins."""
+        strategies = [
+            {"type": "terminal_8", "name": "Terminal 8 (1→6)"},
+            {"type": "3x3_pattern", "name": "Padrão 3x3"},
+            {"type": "2x7_pattern", "name": "Padrão 2x7"}
+        ]
+
+        config = {"chip_value": 1.0, "max_entries": 2}
+        results = []
+
+        for strategy in strategies:
+            result = self.run_simulation(strategy["type"], config, num_spins)
+            result["strategy_name"] = strategy["name"]
+            results.append(result)
+
+        return results
+
+# Example Usage (for testing)
+if __name__ == "__main__":
+    import time
+
+    simulation = VectorizedSimulation(seed=42)
+    config = {"chip_value": 1.0, "max_entries": 2}
+
+    for strategy_type in ["terminal_8", "3x3_pattern", "2x7_pattern"]:
+        start = time.perf_counter()
+        result = simulation.run_simulation(strategy_type, config, 10_000_000)
+        elapsed = time.perf_counter() - start
+        print(f"{strategy_type}: {result['num_spins']:,} spins in {elapsed:.2f}s")
+        print(f"  Total Profit: {result['total_profit']:.2f}")
+        print(f"  Total Bets: {result['total_bets']}")
+        print(f"  Win Rate: {result['win_rate']:.2f}%")
+        print(f"  Avg Profit per Bet: {result['avg_profit_per_bet']:.2f}")